@@ -1 +1,17 @@
-from .main import M12Marker, M21Marker, M31Marker, M11Marker
+import importlib
+from .registry import get_marker, marker_class
+
+# Markers and batch grading are imported on first access, see autograde.registry
+_LAZY = {
+    'M12Marker': 'autograde.main',
+    'M21Marker': 'autograde.main',
+    'M31Marker': 'autograde.main',
+    'M11Marker': 'autograde.main',
+    'grade_cohort': 'autograde.batch',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module 'autograde' has no attribute '{name}'")
@@ -0,0 +1,184 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from autograde import instrument
+from autograde.cache import VerdictCache
+from autograde.ingest import batched
+from autograde.store import VerdictStore, grade_incremental
+
+"""
+Grade a whole cohort in one call.
+
+Each worker process constructs the marker once (solutions, database connection,
+datasets) and then grades many submissions with it, resetting the summary
+between learners.
+"""
+
+# Marker instance (and verdict store, instrumentation recorder) owned by the
+# current worker process
+_marker = None
+_store = None
+_recorder = None
+
+
+def _init_worker(marker_cls, store_path=None, trace=None):
+    """`trace` is None, 'events' or 'profile': what to record for the grading process."""
+    global _marker, _store, _recorder
+    # Sinks inherited from the grading process receive the replayed events there
+    instrument.reset()
+    if trace:
+        _recorder = instrument.add_sink(instrument.Recorder(profiles=trace == 'profile'))
+    _marker = marker_cls()
+    _store = VerdictStore(store_path) if store_path else None
+
+
+def mark(marker, submission):
+    """
+    Run the marking entry point of a marker on one submission.
+    Markers expose `mark_submission`, `mark_exam` or only `check_multiple`.
+    """
+    for name in ('mark_submission', 'mark_exam', 'check_multiple'):
+        method = getattr(marker, name, None)
+        if method is not None:
+            method(submission)
+            return marker.summary
+    raise TypeError(f"{type(marker).__name__} has no marking method")
+
+
+def _grade_one(task):
+    learner, submission = task
+    _marker.reset()
+    hits, misses = VerdictCache.hits, VerdictCache.misses
+
+    start = time.perf_counter()
+    try:
+        with instrument.submission(_marker.exam_name, learner):
+            if _store is not None:
+                grade_incremental(_marker, learner, submission, _store)
+                summary = _marker.summary
+            else:
+                summary = mark(_marker, submission)
+            score = _marker.score()
+        error = None
+    except Exception as e:
+        summary = score = None
+        error = f"{type(e).__name__}: {e}"
+
+    result = {
+        'learner': learner,
+        'summary': summary,
+        'score': score,
+        'reasons': _marker.reasons,
+        'timings': _marker.timings,
+        'error': error,
+        'elapsed': time.perf_counter() - start,
+        'cache_hits': VerdictCache.hits - hits,
+        'cache_misses': VerdictCache.misses - misses,
+    }
+    if _recorder is not None:
+        result['trace'] = _recorder.drain()
+    return result
+
+
+def _grade_batch(batch):
+    return [_grade_one(task) for task in batch]
+
+
+def _tasks(submissions):
+    if hasattr(submissions, 'items'):
+        return iter(submissions.items())
+    if isinstance(submissions, (list, tuple)):
+        return enumerate(submissions)
+    # Already (learner, answers) pairs, e.g. from `ingest.read_submissions`
+    return iter(submissions)
+
+
+def stream_cohort(marker_cls, submissions, max_workers=None, chunksize=16, window=None,
+                  store=None):
+    """
+    Grade submissions lazily and yield the per-learner results in input order.
+
+    `submissions` is a mapping of learner -> answers, a sequence of answers or
+    an iterable of (learner, answers) pairs, read only as results are
+    consumed: at most `window` batches of `chunksize` submissions (2 per
+    worker by default) are in flight, so a generator over a large export is
+    graded with bounded memory.
+
+    With `store` (path of a VerdictStore), verdicts are kept on disk and
+    reused: grading the same cohort again only grades new or changed answers
+    and questions whose key changed.
+
+    When instrumentation is enabled, the events of each submission are
+    recorded in the workers and replayed to the sinks of this process.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    window = window or max_workers * 2
+    batches = batched(_tasks(submissions), chunksize)
+    trace = None
+    if instrument.enabled():
+        trace = 'profile' if instrument.profiling() else 'events'
+
+    def results(future):
+        for result in future.result():
+            if 'trace' in result:
+                instrument.replay(result.pop('trace'))
+            yield result
+
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_worker,
+                             initargs=(marker_cls, store, trace)) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(_grade_batch, batch))
+            if len(pending) >= window:
+                yield from results(pending.popleft())
+        while pending:
+            yield from results(pending.popleft())
+
+
+def grade_cohort(marker_cls, submissions, max_workers=None, chunksize=None, store=None):
+    """
+    Grade many submissions with `marker_cls` across a process pool.
+
+    `submissions` is either a mapping of learner -> answers, a sequence of
+    answers (learners are then identified by their position) or an iterable
+    of (learner, answers) pairs.
+
+    Returns a dict with the per-learner results (in input order), the number
+    of workers, the verdict cache statistics and the wall-clock time of the
+    whole run. When instrumentation is enabled, the phase timings of the run
+    are added as 'phases' and printed as a summary table.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if hasattr(submissions, '__len__'):
+        max_workers = max(1, min(max_workers, len(submissions)))
+        if chunksize is None:
+            # A few chunks per worker keeps IPC low while still balancing load
+            chunksize = max(1, len(submissions) // (max_workers * 4))
+
+    histogram = instrument.add_sink(instrument.Histogram()) if instrument.enabled() else None
+    start = time.perf_counter()
+    try:
+        results = list(stream_cohort(marker_cls, submissions, max_workers, chunksize or 16,
+                                     store=store))
+    finally:
+        instrument.remove_sink(histogram)
+
+    hits = sum(r['cache_hits'] for r in results)
+    lookups = hits + sum(r['cache_misses'] for r in results)
+
+    report = {
+        'results': results,
+        'workers': max_workers,
+        'verdict_cache': {
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+        },
+        'elapsed': time.perf_counter() - start,
+    }
+    if histogram is not None:
+        report['phases'] = histogram.rows()
+        print(histogram.summary())
+    return report
@@ -0,0 +1,117 @@
+import os
+from autograde import instrument
+from autograde.database import file_identity
+from autograde.fingerprint import canonical_sql
+
+
+def database_identity(connection):
+    """
+    Identify the database behind a sqlite connection: the file path together
+    with its inode, size and modification time, so an edited file gets a new
+    identity. Connections from a ConnectionProvider carry the identity of the
+    file they were loaded from, other in-memory databases are identified by
+    the connection itself.
+    """
+    if getattr(connection, 'identity', None) is not None:
+        return connection.identity
+
+    path = ''
+    for _, name, file in connection.execute('PRAGMA database_list'):
+        if name == 'main':
+            path = file
+            break
+
+    if not path:
+        return ('memory', id(connection))
+    return file_identity(path)
+
+
+class SolutionCache():
+    """
+    Results of reference SQL queries, keyed by (canonical query, database
+    identity). The solution query and the database do not change during a
+    grading run, so each reference query is executed once per process.
+
+    Cached DataFrames are shared, callers must not modify them.
+    """
+
+    _frames = {}
+
+    @classmethod
+    def get(cls, solution, connection):
+        key = (canonical_sql(solution), database_identity(connection))
+        df = cls._frames.get(key)
+        if df is None:
+            instrument.count('solution_cache.miss')
+            import pandas as pd
+            df = pd.read_sql_query(solution, connection)
+            cls._frames[key] = df
+        return df
+
+    @classmethod
+    def invalidate(cls, database=None):
+        """
+        Drop cached results. With `database` (a path), only the results
+        computed against that file are dropped.
+        """
+        if database is None:
+            cls._frames.clear()
+            return
+
+        path = os.path.realpath(database)
+        for key in [k for k in cls._frames if k[1][0] == path]:
+            del cls._frames[key]
+
+    @classmethod
+    def size(cls):
+        return len(cls._frames)
+
+
+class VerdictCache():
+    """
+    Verdicts already computed during this run, keyed by the fingerprint of
+    the learner answer and everything else the verdict depends on. Learners
+    submitting the same canonical answer reuse the verdict instead of
+    executing the answer again.
+
+    A cached verdict skips the side effects of grading (printed messages,
+    functions defined in the caller's namespace), so only marker and cohort
+    grading use it: the learner-facing Utils checks opt in with `cache=True`.
+    Set `enabled` to False to execute every answer.
+    """
+
+    enabled = True
+    hits = 0
+    misses = 0
+    _verdicts = {}
+
+    @classmethod
+    def get_or_compute(cls, key, compute):
+        if not cls.enabled:
+            return compute()
+
+        if key in cls._verdicts:
+            cls.hits += 1
+            instrument.count('verdict_cache.hit')
+            return cls._verdicts[key]
+
+        cls.misses += 1
+        instrument.count('verdict_cache.miss')
+        verdict = compute()
+        cls._verdicts[key] = verdict
+        return verdict
+
+    @classmethod
+    def stats(cls):
+        lookups = cls.hits + cls.misses
+        return {
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'hit_ratio': cls.hits / lookups if lookups else 0.0,
+        }
+
+    @classmethod
+    def clear(cls):
+        cls._verdicts.clear()
+        cls.hits = 0
+        cls.misses = 0
@@ -0,0 +1,176 @@
+from functools import partial
+import numpy as np
+import pandas as pd
+
+"""
+DataFrame comparison engine.
+
+Ordered comparison pairs columns by position and groups them by kind once,
+then compares chunk of rows by chunk of rows, cheapest kind first, so a
+difference anywhere near the top of the frames is found without scanning the
+rest:
+    - numeric pairs: exact equality first, `isclose` only on the values that
+      are not exactly equal (NaN, rounding)
+    - object pairs: elementwise equality on the arrays as they are, missing
+      values (None, NaN) being equal to each other, without filled copies
+    - anything else (dates, booleans, extension dtypes) falls back to
+      `Utils.is_1darray_equal`
+
+Unordered comparison (`order` 'multiset' or 'set') hashes every row into one
+64-bit value and compares the counts (or the distinct values) of the hashes
+in a hash table, in O(n) without sorting either frame. Numbers are hashed as
+floats rounded to `decimals` places, so 1 and 1.0000001 hash alike.
+
+Columns can also be matched regardless of their order, by name or, when names
+are not compared, by a hash of their content.
+"""
+
+ORDERS = ('ordered', 'multiset', 'set')
+
+# Rows compared per pass
+CHUNK_ROWS = 1 << 14
+
+ATOL = 1e-6
+DECIMALS = 6
+
+
+def _is_numeric(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in 'iuf'
+
+
+def _is_object(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind == 'O'
+
+
+def _numeric_equal(a, b, atol=ATOL):
+    equal = a == b
+    if equal.all():
+        return True
+    differ = ~equal
+    return bool(np.isclose(a[differ], b[differ], atol=atol, equal_nan=True).all())
+
+
+def _object_equal(a, b):
+    equal = a == b
+    if not isinstance(equal, np.ndarray):
+        return bool(np.array_equal(a, b))
+    if equal.all():
+        return True
+    differ = ~equal
+    return bool((pd.isna(a[differ]) & pd.isna(b[differ])).all())
+
+
+def group_columns(a_val, b_val):
+    """Column positions of two frames of the same width as (numeric, object, other)."""
+    numeric, objects, other = [], [], []
+    for i, (a_dtype, b_dtype) in enumerate(zip(a_val.dtypes, b_val.dtypes)):
+        if _is_numeric(a_dtype) and _is_numeric(b_dtype):
+            numeric.append(i)
+        elif _is_object(a_dtype) and _is_object(b_dtype):
+            objects.append(i)
+        else:
+            other.append(i)
+    return numeric, objects, other
+
+
+def _column(frame, i):
+    if frame.columns.is_unique:
+        return frame[frame.columns[i]]
+    return frame.iloc[:, i]
+
+
+def frames_equal(a_val, b_val, fallback, atol=ATOL):
+    """
+    Whether the columns of two frames of the same shape are equal (or closely
+    equal), compared by position. `fallback(a, b)` compares a pair of columns
+    that is neither numeric nor object.
+    """
+    numeric, objects, other = group_columns(a_val, b_val)
+    checks = ([(partial(_numeric_equal, atol=atol), i) for i in numeric]
+              + [(_object_equal, i) for i in objects]
+              + [(fallback, i) for i in other])
+
+    # Columns are only extracted when reached, so an early mismatch skips the rest
+    columns = {}
+    for start in range(0, max(len(a_val), 1), CHUNK_ROWS):
+        stop = start + CHUNK_ROWS
+        for equal, i in checks:
+            if i not in columns:
+                columns[i] = (_column(a_val, i).to_numpy(), _column(b_val, i).to_numpy())
+            a, b = columns[i]
+            if not equal(a[start:stop], b[start:stop]):
+                return False
+    return True
+
+
+def _hashable(values, decimals):
+    if _is_numeric(values.dtype):
+        # Ints and floats of the same value hash alike; + 0.0 folds -0.0 into 0.0
+        return np.round(values.astype(np.float64), decimals) + 0.0
+    return values
+
+
+def column_hashes(values, decimals=DECIMALS):
+    """64-bit hash of every value of a column, missing values hashing alike."""
+    return pd.util.hash_array(_hashable(np.asarray(values), decimals))
+
+
+def row_hashes(frame, decimals=DECIMALS):
+    """64-bit hash of every row of a frame, depending on the order of its columns."""
+    hashes = np.zeros(len(frame), dtype=np.uint64)
+    for i in range(frame.shape[1]):
+        hashes = hashes * np.uint64(1000003) ^ column_hashes(_column(frame, i).to_numpy(), decimals)
+    return hashes
+
+
+def rows_equal(a_val, b_val, order='multiset', decimals=DECIMALS):
+    """
+    Whether two frames of the same width hold the same rows regardless of
+    their order: with the same multiplicities ('multiset') or as sets ('set').
+    """
+    a_hashes, b_hashes = row_hashes(a_val, decimals), row_hashes(b_val, decimals)
+    if order == 'set':
+        a_hashes, b_hashes = pd.unique(a_hashes), pd.unique(b_hashes)
+    if len(a_hashes) != len(b_hashes):
+        return False
+
+    a_counts = pd.Series(a_hashes).value_counts(sort=False)
+    b_counts = pd.Series(b_hashes).value_counts(sort=False)
+    if len(a_counts) != len(b_counts):
+        return False
+    return bool(b_counts.reindex(a_counts.index).eq(a_counts).all())
+
+
+def _column_signature(values, order, decimals):
+    hashes = column_hashes(values, decimals)
+    if order == 'set':
+        hashes = pd.unique(hashes)
+    if order == 'ordered':
+        return hashes.tobytes()
+    # Wrapping sum: independent of the order of the rows
+    return int(hashes.sum(dtype=np.uint64)), len(hashes)
+
+
+def match_columns(a_val, b_val, by_name=True, order='ordered', decimals=DECIMALS):
+    """
+    `b_val` with its columns reordered to match those of `a_val`, by name or
+    by content, or None when the columns cannot be matched.
+    """
+    if by_name:
+        if not (a_val.columns.is_unique and b_val.columns.is_unique) \
+                or set(a_val.columns) != set(b_val.columns):
+            return None
+        return b_val[a_val.columns]
+
+    unmatched = {}
+    for j in range(b_val.shape[1]):
+        signature = _column_signature(_column(b_val, j).to_numpy(), order, decimals)
+        unmatched.setdefault(signature, []).append(j)
+
+    positions = []
+    for i in range(a_val.shape[1]):
+        signature = _column_signature(_column(a_val, i).to_numpy(), order, decimals)
+        if not unmatched.get(signature):
+            return None
+        positions.append(unmatched[signature].pop(0))
+    return b_val.iloc[:, positions]
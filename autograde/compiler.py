@@ -0,0 +1,89 @@
+import ast
+from functools import lru_cache
+from autograde import instrument
+
+"""
+Compilation of learner and solution code.
+
+Sources are parsed and validated once into code objects, kept in an LRU per
+process keyed by the source (and the requested function name), so the
+reference solutions are compiled once per process and an answer shared by
+many learners, or graded again by a reused sandbox worker, is not parsed
+again.
+
+Function answers are renamed on the AST: the function the question asks for
+keeps its name, otherwise the first function of the answer is renamed, along
+with its recursive calls.
+"""
+
+CACHE_SIZE = 4096
+
+
+class CompileError(Exception):
+    """A source cannot be compiled into what the question asks for."""
+
+
+class _Rename(ast.NodeTransformer):
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+    def visit_FunctionDef(self, node):
+        if node.name == self.old:
+            node.name = self.new
+        self.generic_visit(node)
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Name(self, node):
+        if node.id == self.old:
+            node.id = self.new
+        return node
+
+
+def _parse(source, mode):
+    try:
+        return ast.parse(source, filename='<submission>', mode=mode)
+    except (SyntaxError, ValueError) as e:
+        raise CompileError(f"{type(e).__name__}: {e}") from None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_function(source, name=None):
+    """
+    (code object, function name) of a source defining a function. With `name`,
+    the function is renamed to it unless the source already defines it.
+    """
+    with instrument.phase('compile'):
+        tree = _parse(source, 'exec')
+        defined = [node.name for node in tree.body
+                   if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        if not defined:
+            raise CompileError("no function defined")
+
+        if name is None:
+            name = defined[0]
+        elif name not in defined:
+            tree = ast.fix_missing_locations(_Rename(defined[0], name).visit(tree))
+
+        return compile(tree, '<submission>', 'exec'), name
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(source):
+    """Code object of a single expression, for `eval`."""
+    with instrument.phase('compile'):
+        return compile(_parse(source.strip(), 'eval'), '<submission>', 'eval')
+
+
+def define_function(source, namespace, name=None):
+    """Run a function source in `namespace` and return the function."""
+    code, name = compile_function(source, name)
+    exec(code, namespace)
+    return namespace[name]
+
+
+def cache_info():
+    return {'functions': compile_function.cache_info(),
+            'expressions': compile_expression.cache_info()}
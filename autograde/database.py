@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Number of SQLite virtual machine instructions between two deadline checks
+PROGRESS_STEPS = 1000
+
+# Statements a grading connection may run: reading data and pragma lookups
+READ_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+
+
+class QueryAborted(Exception):
+    """A learner query ran out of its time budget or returned too many rows."""
+
+
+def file_identity(path):
+    stat = os.stat(path)
+    return (os.path.realpath(path), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _read_only_authorizer(action, arg1, arg2, db_name, trigger):
+    if action in READ_ACTIONS:
+        return sqlite3.SQLITE_OK
+    if action == sqlite3.SQLITE_PRAGMA and arg2 is None:
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
+
+
+class GradingConnection(sqlite3.Connection):
+    """sqlite connection that knows which database file it was loaded from."""
+    identity = None
+
+
+class ConnectionProvider():
+    """
+    Read-only connections to a grading database, one per thread.
+
+    With `in_memory`, the database file is read once per process into memory
+    (backup API) and every thread gets its own in-memory copy, so graders never
+    contend on file locks. Otherwise threads open the file itself with
+    `mode=ro&immutable=1`, which skips locking as well.
+
+    Connections only accept reads (query_only pragma and an authorizer), so a
+    learner's DELETE or UPDATE cannot change what other learners are graded on.
+    """
+
+    _providers = {}
+    _providers_lock = threading.Lock()
+
+    def __init__(self, path, in_memory=True, cache_size=-16000, mmap_size=64 * 2**20):
+        self.path = os.path.realpath(path)
+        self.in_memory = in_memory
+        self.pragmas = {'cache_size': cache_size, 'mmap_size': mmap_size}
+        self.identity = file_identity(self.path)
+        self._local = threading.local()
+        self._master = None
+        self._master_lock = threading.Lock()
+
+        if in_memory:
+            self._master = sqlite3.connect(':memory:', check_same_thread=False)
+            source = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+            try:
+                source.backup(self._master)
+            finally:
+                source.close()
+
+    @classmethod
+    def get(cls, path, **kwargs):
+        """Provider shared by the whole process (a forked child builds its own)."""
+        key = (os.path.realpath(path), kwargs.get('in_memory', True), os.getpid())
+        with cls._providers_lock:
+            provider = cls._providers.get(key)
+            if provider is None:
+                provider = cls(path, **kwargs)
+                cls._providers[key] = provider
+        return provider
+
+    def _open(self):
+        if self.in_memory:
+            connection = sqlite3.connect(':memory:', factory=GradingConnection)
+            with self._master_lock:
+                self._master.backup(connection)
+        else:
+            connection = sqlite3.connect(f'file:{self.path}?mode=ro&immutable=1',
+                                         uri=True, factory=GradingConnection)
+
+        for pragma, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {pragma} = {int(value)}')
+        connection.execute('PRAGMA query_only = ON')
+        connection.set_authorizer(_read_only_authorizer)
+        connection.identity = self.identity
+        return connection
+
+    def connection(self):
+        """Connection owned by the calling thread."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._open()
+            self._local.connection = connection
+        return connection
+
+
+def read_query(query, connection, timeout=None, max_rows=None):
+    """
+    Run a query into a DataFrame like `pd.read_sql_query`, but abort it once
+    it runs longer than `timeout` seconds or returns more than `max_rows` rows,
+    before the whole result is materialized.
+    """
+    import pandas as pd
+
+    if timeout is not None:
+        deadline = time.perf_counter() + timeout
+        connection.set_progress_handler(
+            lambda: time.perf_counter() > deadline, PROGRESS_STEPS)
+
+    try:
+        if max_rows is None:
+            return pd.read_sql_query(query, connection)
+
+        # Reading one row more than allowed is enough to know the cap is exceeded
+        chunks = pd.read_sql_query(query, connection, chunksize=max_rows + 1)
+        try:
+            df = next(chunks)
+        finally:
+            chunks.close()
+        if len(df) > max_rows:
+            raise QueryAborted(f"Query returned more than {max_rows} rows")
+        return df
+    except (sqlite3.OperationalError, pd.errors.DatabaseError) as e:
+        if timeout is not None and time.perf_counter() > deadline:
+            raise QueryAborted(f"Query timed out after {timeout:g}s") from e
+        raise
+    finally:
+        if timeout is not None:
+            connection.set_progress_handler(None, PROGRESS_STEPS)
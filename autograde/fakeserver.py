@@ -0,0 +1,99 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+"""
+Local stand-in for the submission API.
+
+Serves GET /submission/<email> from an in-memory {email: answers} mapping, with
+ETags, optional latency and injected failures, so the fetcher can be exercised
+and benchmarked without network access:
+
+    with FakeSubmissionServer({'learner@example.com': ['A', 'C']}) as server:
+        submissions = SubmissionFetcher(server.url).fetch(['learner@example.com'])
+"""
+
+
+class FakeSubmissionServer():
+    def __init__(self, submissions, latency=0.0, failures=0, malformed=(), port=0):
+        """
+        `latency` (seconds) is added to every response, the first `failures`
+        requests of every learner answer 503 and the learners in `malformed`
+        get a body that is not JSON.
+        """
+        self.submissions = submissions
+        self.latency = latency
+        self.failures = failures
+        self.malformed = set(malformed)
+        self.requests = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/submission/{{email}}'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                email = unquote(self.path.rsplit('/', 1)[-1])
+                with server._lock:
+                    attempt = server._attempts.get(email, 0)
+                    server._attempts[email] = attempt + 1
+                if attempt < server.failures:
+                    return self._send(503, b'')
+
+                if email not in server.submissions:
+                    return self._send(404, b'{"detail": "Not found"}')
+                if email in server.malformed:
+                    return self._send(200, b'<html>Bad gateway</html>')
+
+                answers = [{'answer': answer} for answer in server.submissions[email]]
+                body = json.dumps({'email': email, 'answers': answers}).encode('utf-8')
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    return self._send(304, b'', etag)
+                self._send(200, body, etag)
+
+            def _send(self, status, body, etag=None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
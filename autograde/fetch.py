@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from urllib.parse import quote
+from autograde import instrument
+from autograde.ingest import IngestError, normalize
+from autograde.paths import atomic_path, cache_dir
+
+"""
+Concurrent submission download.
+
+Submissions of a whole cohort are fetched from the submission API over one
+pooled aiohttp session with a bounded number of requests in flight. Failed
+requests (connection errors, timeouts, 429 and 5xx) are retried with jittered
+exponential backoff, and every response is kept on disk with its ETag so
+refetching an unchanged submission costs a 304.
+
+aiohttp is only needed here: pip install aiohttp
+"""
+
+SUBMISSION_URL = 'https://cspyclient.up.railway.app/submission/{email}'
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """A submission could not be downloaded."""
+
+
+class SubmissionFetcher():
+    def __init__(self, url=SUBMISSION_URL, concurrency=16, retries=3, backoff=0.5,
+                 timeout=30.0, use_cache=True):
+        """`url` is a template with an {email} field."""
+        self.url = url
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self.errors = {}
+        self.stats = {'requests': 0, 'retries': 0, 'not_modified': 0}
+
+    def _cache_path(self, url):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir('submissions'), f'{name}.json')
+
+    def _read_cache(self, url):
+        if not self.use_cache:
+            return None
+        try:
+            with open(self._cache_path(url), 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, url, etag, record):
+        if not self.use_cache or not etag:
+            return
+        with atomic_path(self._cache_path(url)) as tmp_path, open(tmp_path, 'w') as file:
+            json.dump({'etag': etag, 'record': record}, file)
+
+    async def _get(self, session, url):
+        """Submission record at `url`, or None when there is none (404)."""
+        import aiohttp
+
+        cached = self._read_cache(url)
+        headers = {'If-None-Match': cached['etag']} if cached else {}
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                instrument.count('fetch.retry')
+                # Full jitter keeps retries of many learners from arriving together
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+
+            self.stats['requests'] += 1
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached:
+                        self.stats['not_modified'] += 1
+                        return cached['record']
+                    if response.status == 404:
+                        return None
+                    if response.status in RETRY_STATUSES:
+                        error = f'HTTP {response.status}'
+                        continue
+                    if response.status != 200:
+                        raise FetchError(f'HTTP {response.status}')
+                    try:
+                        record = await response.json(content_type=None)
+                    except ValueError as e:
+                        raise FetchError(f'malformed response: {e}')
+                    self._write_cache(url, response.headers.get('ETag'), record)
+                    return record
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f'{type(e).__name__}: {e}'
+
+        raise FetchError(f'{error} after {self.retries + 1} attempts')
+
+    async def fetch_all(self, emails):
+        """
+        {email: answers} of every learner that has a submission. Learners whose
+        submission could not be fetched or read are left out, with the error
+        in `errors`.
+        """
+        import aiohttp
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def fetch_one(email):
+                async with semaphore:
+                    try:
+                        with instrument.phase('fetch'):
+                            record = await self._get(session, self.url.format(email=quote(email, safe='@')))
+                        # One bad record must not abort the fetch of the cohort
+                        return email, None if record is None else normalize(record)[1]
+                    except (FetchError, IngestError, ValueError) as e:
+                        self.errors[email] = str(e)
+                        return email, None
+
+            results = await asyncio.gather(*(fetch_one(email) for email in emails))
+
+        return {email: answers for email, answers in results if answers is not None}
+
+    def fetch(self, emails):
+        """Blocking `fetch_all`, for scripts and notebooks without an event loop."""
+        return asyncio.run(self.fetch_all(emails))
@@ -0,0 +1,99 @@
+import ast
+import hashlib
+import re
+
+"""
+Canonical forms of learner answers. Two answers with the same canonical form
+are graded identically, so their fingerprint can key a verdict cache.
+"""
+
+SQL_KEYWORDS = {
+    'ALL', 'AND', 'AS', 'ASC', 'AVG', 'BETWEEN', 'BY', 'CASE', 'CAST', 'COUNT',
+    'CROSS', 'DESC', 'DISTINCT', 'ELSE', 'END', 'EXCEPT', 'EXISTS', 'FROM',
+    'FULL', 'GLOB', 'GROUP', 'HAVING', 'IN', 'INNER', 'INTERSECT', 'IS', 'JOIN',
+    'LEFT', 'LIKE', 'LIMIT', 'MAX', 'MIN', 'NATURAL', 'NOT', 'NULL', 'OFFSET',
+    'ON', 'OR', 'ORDER', 'OUTER', 'OVER', 'PARTITION', 'RIGHT', 'ROUND',
+    'SELECT', 'SUM', 'THEN', 'UNION', 'USING', 'WHEN', 'WHERE', 'WITH',
+}
+
+SQL_TOKEN = re.compile(r"""
+      (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<literal>'(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<number>\d+(?:\.\d*)?|\.\d+)
+    | (?P<space>\s+)
+    | (?P<symbol><=|>=|<>|!=|==|\|\||.)
+""", re.VERBOSE | re.DOTALL)
+
+
+def canonical_sql(query):
+    """
+    Canonical form of a SQL query: comments dropped, whitespace collapsed,
+    keywords upper-cased and trailing semicolons removed. Literals and quoted
+    identifiers are kept as written.
+    """
+    tokens = []
+    for match in SQL_TOKEN.finditer(query):
+        kind, token = match.lastgroup, match.group()
+        if kind in ('comment', 'space'):
+            continue
+        if kind == 'word' and token.upper() in SQL_KEYWORDS:
+            token = token.upper()
+        tokens.append(token)
+
+    while tokens and tokens[-1] == ';':
+        tokens.pop()
+    return ' '.join(tokens)
+
+
+def sql_ordered(query):
+    """
+    Whether the rows of a query come in a defined order: the outermost
+    statement ends with an ORDER BY. ORDER BY inside parentheses (window
+    functions, subqueries, CTEs) or before the last UNION, INTERSECT or
+    EXCEPT does not order the result.
+    """
+    ordered = False
+    depth = 0
+    previous = None
+    for match in SQL_TOKEN.finditer(query):
+        kind, token = match.lastgroup, match.group()
+        if kind in ('comment', 'space'):
+            continue
+        if kind == 'word':
+            token = token.upper()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            if token in ('UNION', 'INTERSECT', 'EXCEPT'):
+                ordered = False
+            elif token == 'BY' and previous == 'ORDER':
+                ordered = True
+        previous = token
+    return ordered
+
+
+def canonical_python(source):
+    """
+    Canonical form of Python source: the dump of its AST, which ignores
+    formatting and comments. Source that does not parse falls back to its
+    whitespace-collapsed text.
+    """
+    try:
+        return ast.dump(ast.parse(source.strip()))
+    except (SyntaxError, ValueError):
+        return 'unparsed:' + re.sub(r'\s+', ' ', source).strip()
+
+
+def fingerprint(canonical):
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def sql_fingerprint(query):
+    return fingerprint(canonical_sql(query))
+
+
+def python_fingerprint(source):
+    return fingerprint(canonical_python(source))
@@ -0,0 +1,182 @@
+import hashlib
+import marshal
+import math
+import os
+import pickle
+import random
+import string
+import time
+from collections import namedtuple
+from autograde.paths import atomic_path, cache_dir
+
+"""
+Seeded test cases of function questions.
+
+Each M2.1 function has a generator of random inputs and a reference
+implementation. For a (function, seed, count) the cases are generated once,
+the reference outputs computed once, and both pickled to the cache directory,
+so every marker and worker grading the cohort reuses them.
+
+Besides `count` random cases, a few large inputs (tens of thousands of items)
+expose quadratic learner code: their reference time sets a performance
+budget, and a learner function over budget (or timing out) on them is
+flagged as slow.
+"""
+
+# Large input cases per function, and their size
+LARGE_CASES = 3
+LARGE_SIZE = 20000
+
+# A learner may be this many times slower than the reference on large inputs
+BUDGET_FACTOR = 50
+BUDGET_FLOOR = 0.05
+
+GeneratedCases = namedtuple('GeneratedCases', ['cases', 'large', 'budget'])
+
+
+def values_equal(result, expected):
+    """== with a tolerance for floats."""
+    if isinstance(expected, float) and isinstance(result, (int, float)):
+        return math.isclose(result, expected, rel_tol=1e-9, abs_tol=1e-9)
+    return result == expected
+
+
+def _numbers(rng, size):
+    low = rng.randint(-1000, 0)
+    return [rng.randint(low, low + rng.randint(1, 2000)) for _ in range(size)]
+
+
+def _size(rng, large):
+    return LARGE_SIZE if large else rng.choice((1, 2, 3, 5, 10, 50, 200))
+
+
+def gen_count_min(rng, large=False):
+    return (_numbers(rng, _size(rng, large)),)
+
+
+def ref_count_min(l):
+    return l.count(min(l))
+
+
+def gen_calculate_range(rng, large=False):
+    return (tuple(_numbers(rng, _size(rng, large))),)
+
+
+def ref_calculate_range(tup):
+    return max(tup) - min(tup)
+
+
+EMAIL_CHARS = string.ascii_letters + string.digits + '._+*/-'
+
+
+def gen_extract_email(rng, large=False):
+    length = LARGE_SIZE if large else rng.randint(1, 20)
+    user = ''.join(rng.choice(EMAIL_CHARS) for _ in range(length))
+    domain = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 12)))
+    return (f"{user}@{domain}.{rng.choice(('com', 'vn', 'edu.vn', 'org'))}", rng.random() < 0.5)
+
+
+def ref_extract_email(email, user=True):
+    return email.split('@')[0 if user else 1]
+
+
+def _item(rng):
+    return {
+        'unit_weight': rng.randint(1, 1000) / 10,
+        'unit_price': rng.randint(1, 10000) / 10,
+        'number_of_units': rng.randint(1, 50),
+    }
+
+
+def gen_item_calculator(rng, large=False):
+    return (_item(rng), rng.random() < 0.5)
+
+
+def ref_item_calculator(item, weight):
+    return item['unit_weight' if weight else 'unit_price'] * item['number_of_units']
+
+
+def _receipt(rng, large, field):
+    while True:
+        size = LARGE_SIZE if large else rng.randint(1, 30)
+        receipt = {f'item_{i}': _item(rng) for i in range(size)}
+        totals = sorted(item[field] * item['number_of_units'] for item in receipt.values())
+        # A tie for the maximum has more than one right answer
+        if len(totals) < 2 or totals[-1] != totals[-2]:
+            return (receipt,)
+
+
+def gen_heaviest_item(rng, large=False):
+    return _receipt(rng, large, 'unit_weight')
+
+
+def ref_heaviest_item(receipt):
+    return max(receipt, key=lambda k: receipt[k]['unit_weight'] * receipt[k]['number_of_units'])
+
+
+def gen_priciest_item(rng, large=False):
+    return _receipt(rng, large, 'unit_price')
+
+
+def ref_priciest_item(receipt):
+    return max(receipt, key=lambda k: receipt[k]['unit_price'] * receipt[k]['number_of_units'])
+
+
+class CaseGenerators():
+    _generators = {}
+    _cases = {}
+
+    @classmethod
+    def register(cls, name, generate, reference):
+        """`generate(rng, large)` returns the args of one case, `reference(*args)` its output."""
+        cls._generators[name] = (generate, reference)
+
+    @classmethod
+    def available(cls, name):
+        return name in cls._generators
+
+    @classmethod
+    def cases(cls, name, seed=0, count=200):
+        """GeneratedCases of the function `name`, built once per (seed, count)."""
+        generate, reference = cls._generators[name]
+        code = marshal.dumps(generate.__code__) + marshal.dumps(reference.__code__)
+        key = (name, seed, count, hashlib.sha1(code).hexdigest()[:12])
+        if key not in cls._cases:
+            cls._cases[key] = cls._load_or_generate(key, generate, reference)
+        return cls._cases[key]
+
+    @classmethod
+    def _load_or_generate(cls, key, generate, reference):
+        path = os.path.join(cache_dir('cases'), '-'.join(map(str, key)) + '.pkl')
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+
+        name, seed, count, _ = key
+        rng = random.Random(f'{name}-{seed}')
+        inputs = [generate(rng) for _ in range(count)]
+        cases = tuple((args, reference(*args)) for args in inputs)
+
+        large, elapsed = [], 0.0
+        for _ in range(LARGE_CASES):
+            args = generate(rng, large=True)
+            start = time.perf_counter()
+            large.append((args, reference(*args)))
+            elapsed += time.perf_counter() - start
+        generated = GeneratedCases(cases, tuple(large), max(BUDGET_FLOOR, elapsed * BUDGET_FACTOR))
+
+        with atomic_path(path) as tmp_path, open(tmp_path, 'wb') as file:
+            pickle.dump(generated, file, protocol=pickle.HIGHEST_PROTOCOL)
+        return generated
+
+    @classmethod
+    def clear(cls):
+        cls._cases.clear()
+
+
+CaseGenerators.register('count_min', gen_count_min, ref_count_min)
+CaseGenerators.register('calculate_range', gen_calculate_range, ref_calculate_range)
+CaseGenerators.register('extract_email', gen_extract_email, ref_extract_email)
+CaseGenerators.register('item_calculator', gen_item_calculator, ref_item_calculator)
+CaseGenerators.register('heaviest_item', gen_heaviest_item, ref_heaviest_item)
+CaseGenerators.register('priciest_item', gen_priciest_item, ref_priciest_item)
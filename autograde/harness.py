@@ -0,0 +1,128 @@
+import copy
+import operator
+import re
+import signal
+import threading
+import time
+from collections import namedtuple
+from autograde.compiler import define_function
+from autograde.fingerprint import python_fingerprint
+
+"""
+Test harness of function questions.
+
+A learner function and all the test cases of a question travel to a sandbox
+worker in one call, which runs every case and sends back one result per case:
+passed, failed, raised or ran out of its time budget, with the time it took.
+A case that raises does not stop the others, and the pass ratio of the cases
+decides partial credit.
+"""
+
+PASS, FAIL, ERROR, TIMEOUT = 'pass', 'fail', 'error', 'timeout'
+
+CaseResult = namedtuple('CaseResult', ['status', 'elapsed', 'error'])
+
+
+def learner_globals():
+    """Modules learner functions may use without importing them."""
+    import pandas as pd
+    return {'re': re, 'pd': pd}
+
+
+class CaseTimeout(Exception):
+    """A test case ran out of its time budget."""
+
+
+class _time_limit():
+    """Raise CaseTimeout in the block after `seconds` (main thread, Unix only)."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.enabled = (bool(seconds) and hasattr(signal, 'setitimer')
+                        and threading.current_thread() is threading.main_thread())
+
+    def _expire(self, signum, frame):
+        raise CaseTimeout(f"exceeded {self.seconds:g}s")
+
+    def __enter__(self):
+        if self.enabled:
+            self.previous = signal.signal(signal.SIGALRM, self._expire)
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+
+    def __exit__(self, *exc):
+        if self.enabled:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.previous)
+
+
+def run_cases(func, cases, case_timeout=None, equal=operator.eq):
+    """
+    CaseResult of `func` on every (args, expected) case. Each call gets its
+    own copy of the args: cases are shared by every learner a worker grades,
+    and a learner function may change its input.
+    """
+    results = []
+    for args, expected in cases:
+        args = copy.deepcopy(args)
+        start = time.perf_counter()
+        try:
+            with _time_limit(case_timeout):
+                result = func(*args)
+            status, error = (PASS if equal(result, expected) else FAIL), None
+        except MemoryError:
+            raise
+        except CaseTimeout as e:
+            status, error = TIMEOUT, str(e)
+        except Exception as e:
+            status, error = ERROR, f"{type(e).__name__}: {e}"
+        results.append(CaseResult(status, time.perf_counter() - start, error))
+    return results
+
+
+def run_function_cases(fixtures, answer, func_name, cases, case_timeout=None, equal=operator.eq):
+    """
+    Sandbox task: define the learner function (renamed to `func_name`) and
+    run it on every case.
+    """
+    try:
+        func = define_function(answer, learner_globals(), func_name)
+    except MemoryError:
+        raise
+    except Exception as e:
+        return {'found': False, 'cases': [],
+                'messages': [f"Error occurred while executing function {func_name} - {e}",
+                             f"function {func_name} not found"]}
+
+    return {'found': True, 'cases': run_cases(func, cases, case_timeout, equal), 'messages': []}
+
+
+def pass_ratio(results):
+    return sum(r.status == PASS for r in results) / len(results) if results else 0.0
+
+
+def failures(results, limit=5):
+    """Messages of the (first `limit`) cases that did not pass."""
+    failed = [(i, r) for i, r in enumerate(results, start=1) if r.status != PASS]
+    messages = [f"case {i}: {r.error or 'wrong result'}" for i, r in failed[:limit]]
+    if len(failed) > limit:
+        messages.append(f"{len(failed) - limit} more cases failed")
+    return messages
+
+
+_references = {}
+
+
+def reference_outputs(solution, inputs, namespace=None, memo=True):
+    """
+    Outputs of the solution source on each argument tuple of `inputs`,
+    computed once per process. Without `memo` they are computed again, for a
+    `namespace` that may have changed since (a notebook's globals).
+    """
+    key = (python_fingerprint(solution), repr(inputs))
+    if not memo or key not in _references:
+        func = define_function(solution, namespace if namespace is not None else {})
+        outputs = [func(*args) for args in inputs]
+        if not memo:
+            return outputs
+        _references[key] = outputs
+    return _references[key]
@@ -0,0 +1,69 @@
+import gzip
+import json
+from itertools import islice
+
+"""
+Streaming submission ingestion.
+
+Submission exports are newline-delimited JSON, one record per learner, in the
+shape served by the submission API:
+
+    {"email": "learner@example.com", "answers": [{"answer": "A"}, ...]}
+
+Records are read lazily, one line at a time, and normalized into the
+(learner, answers) pairs the markers and `grade_cohort` expect, so an export of
+any size is never held in memory at once.
+"""
+
+LEARNER_KEYS = ('email', 'learner', 'id')
+
+
+class IngestError(ValueError):
+    """A submission record cannot be normalized."""
+
+
+def normalize(record, position=None):
+    """(learner, answers) of one submission record."""
+    if isinstance(record, list):
+        return position, [_answer(item) for item in record]
+    if not isinstance(record, dict) or not isinstance(record.get('answers'), list):
+        raise IngestError("a record must be a list of answers or have an 'answers' list")
+
+    learner = next((record[key] for key in LEARNER_KEYS if key in record), position)
+    return learner, [_answer(item) for item in record['answers']]
+
+
+def _answer(item):
+    if isinstance(item, dict):
+        return item.get('answer', '')
+    return '' if item is None else item
+
+
+def read_submissions(path, strict=False):
+    """
+    Yield (learner, answers) from a JSONL export (gzipped when it ends in .gz).
+
+    Malformed lines are skipped with a warning, or raise IngestError when
+    `strict`. Learners without an identifier get their line number.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield normalize(json.loads(line), number)
+            except (json.JSONDecodeError, IngestError) as e:
+                if strict:
+                    raise IngestError(f"{path}:{number}: {e}") from e
+                print(f"Skipping {path}:{number}: {e}")
+
+
+def batched(iterable, size):
+    """Lists of at most `size` items of `iterable`, read lazily."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,396 @@
+import contextlib
+import cProfile
+import heapq
+import io
+import json
+import math
+import os
+import pstats
+import threading
+import time
+from collections import namedtuple
+
+"""
+Timers and counters of the grading hot paths.
+
+Grading code marks where its time goes and what it counts:
+
+    with instrument.phase('compare'):
+        correct = Utils.is_equal(df_sub, df_sol)
+    instrument.count('verdict_cache.hit')
+
+Phases are fetch, fixture, compile, execute, reference, compare and report.
+Every event is tagged with the exam and question being graded, set by the
+grading plan for the thread grading it. Events go to the registered sinks:
+    - Histogram: count, total and log-scale latency histogram per phase and
+      question, rendered as a summary table
+    - JsonlTrace: one JSON line per event
+    - SlowestProfiles: cProfile of the N slowest submissions
+
+With no sink registered `phase` and `question` return a shared no-op context
+and `count` returns at once, so instrumented code costs one function call.
+
+Cohort grading records the events of each submission in the pool workers and
+replays them in the grading process, where the sinks live:
+
+    histogram = instrument.enable(trace='trace.jsonl', profile=5)
+    report = grade_cohort(M21Marker, submissions)    # prints the summary table
+    print(instrument.summary())
+    instrument.disable()
+"""
+
+PHASES = ('fetch', 'fixture', 'compile', 'execute', 'reference', 'compare', 'report')
+
+# kind is 'phase' (value in seconds) or 'count'
+Event = namedtuple('Event', ['kind', 'name', 'exam', 'question', 'value'])
+
+_sinks = []
+# (exam, question) being graded by each thread
+_local = threading.local()
+_NULL = contextlib.nullcontext()
+
+
+def enabled():
+    return bool(_sinks)
+
+
+def profiling():
+    return any(getattr(sink, 'profiles', False) for sink in _sinks)
+
+
+def add_sink(sink):
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def reset():
+    """Drop every sink without closing it, e.g. in a forked process."""
+    _sinks.clear()
+
+
+def emit(event):
+    for sink in _sinks:
+        sink.record(event)
+
+
+def _tags():
+    return getattr(_local, 'tags', (None, None))
+
+
+class _Phase():
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        emit(Event('phase', self.name, *_tags(), time.perf_counter() - self.start))
+
+
+class _Question():
+    __slots__ = ('tags', 'previous')
+
+    def __init__(self, exam, number):
+        self.tags = (exam, number)
+
+    def __enter__(self):
+        self.previous = _tags()
+        _local.tags = self.tags
+
+    def __exit__(self, *exc):
+        _local.tags = self.previous
+
+
+class _Submission():
+    def __init__(self, exam, learner):
+        self.exam = exam
+        self.learner = learner
+        self.profiler = None
+
+    def __enter__(self):
+        if profiling():
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stats = None
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.create_stats()
+            stats = self.profiler.stats
+        for sink in _sinks:
+            sink.submission(self.exam, self.learner, elapsed, stats)
+
+
+def phase(name):
+    """Context timing a phase of the question being graded."""
+    if not _sinks:
+        return _NULL
+    return _Phase(name)
+
+
+def count(name, value=1):
+    if _sinks:
+        emit(Event('count', name, *_tags(), value))
+
+
+def question(exam, number):
+    """Context tagging the events of the calling thread with a question."""
+    if not _sinks:
+        return _NULL
+    return _Question(exam, number)
+
+
+def submission(exam, learner):
+    """Context around the grading of one submission, profiled when a sink asks for it."""
+    if not _sinks:
+        return _NULL
+    return _Submission(exam, learner)
+
+
+def replay(trace):
+    """Send the events recorded by a Recorder in another process to the sinks."""
+    events, submissions = trace
+    for event in events:
+        emit(Event(*event))
+    for exam, learner, elapsed, stats in submissions:
+        for sink in _sinks:
+            sink.submission(exam, learner, elapsed, stats)
+
+
+class Recorder():
+    """Keeps events and submissions until `drain`, to send them to another process."""
+
+    def __init__(self, profiles=False):
+        self.profiles = profiles
+        self.events = []
+        self.submissions = []
+
+    def record(self, event):
+        self.events.append(tuple(event))
+
+    def submission(self, exam, learner, elapsed, stats):
+        self.submissions.append((exam, learner, elapsed, stats))
+
+    def drain(self):
+        trace = (self.events, self.submissions)
+        self.events, self.submissions = [], []
+        return trace
+
+
+# Latency histogram buckets: [1us * 2^i, 1us * 2^(i + 1)), the last one open
+BUCKETS = 32
+BUCKET_BASE = 1e-6
+
+
+def _bucket(seconds):
+    if seconds <= BUCKET_BASE:
+        return 0
+    return min(BUCKETS - 1, int(math.log2(seconds / BUCKET_BASE)))
+
+
+class Histogram():
+    """Count, total, max and latency histogram of every (phase, exam, question)."""
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.submissions = 0
+
+    def record(self, event):
+        key = (event.name, event.exam, event.question)
+        if event.kind == 'count':
+            self.counters[key] = self.counters.get(key, 0) + event.value
+            return
+
+        stat = self.phases.get(key)
+        if stat is None:
+            stat = self.phases[key] = [0, 0.0, 0.0, [0] * BUCKETS]
+        stat[0] += 1
+        stat[1] += event.value
+        stat[2] = max(stat[2], event.value)
+        stat[3][_bucket(event.value)] += 1
+
+    def submission(self, exam, learner, elapsed, stats):
+        self.submissions += 1
+
+    @staticmethod
+    def _quantile(stat, q):
+        """Upper edge of the bucket holding the q-quantile, capped by the max."""
+        count, _, largest, buckets = stat
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(largest, BUCKET_BASE * 2 ** (i + 1))
+        return largest
+
+    def rows(self, by_question=False):
+        """One dict per phase (and exam and question with `by_question`)."""
+        merged = {}
+        for (name, exam, number), stat in self.phases.items():
+            key = (name, exam, number) if by_question else (name, None, None)
+            if key not in merged:
+                merged[key] = [0, 0.0, 0.0, [0] * BUCKETS]
+            total = merged[key]
+            total[0] += stat[0]
+            total[1] += stat[1]
+            total[2] = max(total[2], stat[2])
+            total[3] = [a + b for a, b in zip(total[3], stat[3])]
+
+        order = {name: i for i, name in enumerate(PHASES)}
+        rows = []
+        for (name, exam, number), stat in sorted(
+                merged.items(),
+                key=lambda item: (order.get(item[0][0], len(PHASES)), item[0][0],
+                                  str(item[0][1]), item[0][2] or 0)):
+            rows.append({
+                'phase': name,
+                'exam': exam,
+                'question': number,
+                'count': stat[0],
+                'total': stat[1],
+                'p50': self._quantile(stat, 0.5),
+                'p99': self._quantile(stat, 0.99),
+                'max': stat[2],
+            })
+        return rows
+
+    def counts(self):
+        """{counter: total} over every exam and question."""
+        totals = {}
+        for (name, _, _), value in self.counters.items():
+            totals[name] = totals.get(name, 0) + value
+        return dict(sorted(totals.items()))
+
+    def summary(self, by_question=False):
+        """Summary table of the phases and counters."""
+        lines = [f"{'phase':<10} {'question':>8} {'count':>8} {'total s':>9} "
+                 f"{'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for row in self.rows(by_question):
+            number = '' if row['question'] is None else f"Q{row['question']}"
+            lines.append(f"{row['phase']:<10} {number:>8} {row['count']:>8} "
+                         f"{row['total']:>9.3f} {row['p50'] * 1000:>9.3f} "
+                         f"{row['p99'] * 1000:>9.3f} {row['max'] * 1000:>9.3f}")
+        for name, value in self.counts().items():
+            lines.append(f"{name}: {value:g}")
+        return '\n'.join(lines)
+
+    def close(self):
+        pass
+
+
+class JsonlTrace():
+    """
+    One JSON line per event, followed by a 'submission' line at the end of
+    each submission graded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a', buffering=1 << 16)
+        # Forked processes inherit the file, only the opening process writes
+        self.pid = os.getpid()
+
+    def _write(self, record):
+        if os.getpid() == self.pid:
+            self.file.write(json.dumps(record) + '\n')
+
+    def record(self, event):
+        self._write({'time': time.time(), **event._asdict()})
+
+    def submission(self, exam, learner, elapsed, stats):
+        self._write({'time': time.time(), 'kind': 'submission', 'name': str(learner),
+                     'exam': exam, 'question': None, 'value': elapsed})
+
+    def close(self):
+        if os.getpid() == self.pid and not self.file.closed:
+            self.file.close()
+
+
+class _Captured():
+    """Profile stats in the shape pstats loads."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class SlowestProfiles():
+    """cProfile stats of the `slowest` slowest submissions."""
+
+    profiles = True
+
+    def __init__(self, slowest=5):
+        self.slowest = slowest
+        self._heap = []
+        self._seen = 0
+
+    def record(self, event):
+        pass
+
+    def submission(self, exam, learner, elapsed, stats):
+        if stats is None:
+            return
+        self._seen += 1
+        entry = (elapsed, self._seen, exam, learner, stats)
+        if len(self._heap) < self.slowest:
+            heapq.heappush(self._heap, entry)
+        elif elapsed > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def profiles_by_time(self):
+        """(exam, learner, elapsed, pstats.Stats) of the slowest submissions, slowest first."""
+        return [(exam, learner, elapsed, pstats.Stats(_Captured(stats)))
+                for elapsed, _, exam, learner, stats in sorted(self._heap, reverse=True)]
+
+    def summary(self, limit=15, sort='cumulative'):
+        parts = []
+        for exam, learner, elapsed, stats in self.profiles_by_time():
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats(sort).print_stats(limit)
+            parts.append(f"{exam} {learner}: {elapsed * 1000:.1f} ms\n{stream.getvalue().strip()}")
+        return '\n\n'.join(parts)
+
+    def close(self):
+        pass
+
+
+def enable(trace=None, profile=0):
+    """
+    Register a Histogram, and a JsonlTrace to `trace` and SlowestProfiles of
+    the `profile` slowest submissions when given. Returns the Histogram.
+    """
+    histogram = add_sink(Histogram())
+    if trace:
+        add_sink(JsonlTrace(trace))
+    if profile:
+        add_sink(SlowestProfiles(profile))
+    return histogram
+
+
+def summary():
+    """Summaries of every sink that has one."""
+    return '\n\n'.join(text for text in (sink.summary() for sink in _sinks
+                                         if hasattr(sink, 'summary')) if text)
+
+
+def disable():
+    """Close and drop every sink."""
+    for sink in _sinks:
+        sink.close()
+    reset()
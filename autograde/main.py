@@ -1,6 +1,14 @@
-from abc import ABC, abstractmethod
-import pandas as pd
-import re
+import threading
+from abc import ABC
+from autograde import instrument
+from autograde.cache import VerdictCache
+from autograde.compiler import compile_expression
+from autograde.fingerprint import python_fingerprint
+from autograde.generators import LARGE_CASES, CaseGenerators, values_equal
+from autograde.harness import TIMEOUT, failures, learner_globals, pass_ratio, run_function_cases
+from autograde.plan import load_plan, question_hash
+from autograde.results import render_summary
+from autograde.sandbox import Sandbox, SandboxError
 
 """
 Issues:
@@ -10,10 +18,51 @@ Issues:
 """
 
 
+def run_generated_cases(fixtures, answer, func_name, cases, case_timeout):
+    """
+    Sandbox task: run the learner function on the spec cases, then on the
+    generated and large cases the worker holds in its fixtures.
+    """
+    generated = fixtures['generated'][func_name]
+    return run_function_cases(fixtures, answer, func_name,
+                              cases + generated.cases + generated.large,
+                              case_timeout, values_equal)
+
+
+# Copy-on-write is a global pandas option, set around one expression at a time
+_copy_on_write = threading.Lock()
+
+
+def eval_expression(fixtures, expression):
+    """
+    Sandbox task: evaluate a learner expression against the `df` fixture.
+
+    The fixture is shared by every learner a worker grades (and by the whole
+    grader where fork is not available), so the expression gets a shallow
+    copy under copy-on-write: an in-place expression such as
+    df.drop(..., inplace=True) changes its copy, never the fixture.
+    """
+    import pandas as pd
+    with _copy_on_write, pd.option_context('mode.copy_on_write', True):
+        return eval(compile_expression(expression), {'pd': pd},
+                    {'df': fixtures['df'].copy(deep=False)})
+
+
 class ExamMarkerBase(ABC):
+    # Name of the exam spec in autograde/specs
+    SPEC = None
+    # What verdicts depend on besides the exam spec (dataset version, options)
+    verdict_context = ()
+    # QuestionScheduler grading the questions of a submission concurrently
+    scheduler = None
+
     def __init__(self):
+        self.plan = load_plan(self.SPEC)
+        self.exam_name = self.plan.exam
         self.solutions = self.get_solutions()
         self.summary = self.initialize_summary()
+        self.reasons = {}
+        self.timings = {}
 
     def initialize_summary(self):
         return {
@@ -23,545 +72,263 @@ class ExamMarkerBase(ABC):
             'Correct': [],
         }
 
-    @abstractmethod
-    def get_solutions(self):
-        pass
-
-    @abstractmethod
-    def check_multiple(self, submission):
-        pass
-
-    @abstractmethod
-    def display_summary(self, submission):
-        pass
-
-
-class M21Marker(ExamMarkerBase):
-    def __init__(self):
-        super().__init__()
-        self.exam_name = "M2.1"
+    def reset(self):
+        self.summary = self.initialize_summary()
+        self.reasons = {}
+        self.timings = {}
 
     def get_solutions(self):
-        return {
-            "1": "A",
-            "2": "B",
-            "3": "c,e",
-            "4": "B",
-            "5": "E",
-            "6": "A,C",
-            "7": "C,D",
-            "8": "C"
-        }
+        return self.plan.solutions()
+
+    def reload(self):
+        """
+        Compile the spec again (e.g. after an answer key was edited) and drop
+        everything prepared from the previous plan.
+        """
+        self.plan = load_plan(self.SPEC, reload=True)
+        self.exam_name = self.plan.exam
+        self.solutions = self.get_solutions()
 
-    def check_multiple(self, submission):
-
-        for i, answer in enumerate(submission, 1):
-            solution = self.solutions.get(str(i))
-            if not answer:
-                self.summary['Not submitted'].append(i)
-                continue
-
-            if i in {3, 6, 7}:
-                self.__evaluate_special_cases(i, answer, solution)
-            else:
-                if answer == solution:
-                    self.summary['Correct'].append(i)
-                else:
-                    self.summary['Incorrect'].append(i)
+    def cache_key(self, question, answer):
+        return (self.exam_name, question.number, question_hash(question),
+                python_fingerprint(answer)) + self.verdict_context
+
+    def run_cached(self, question, answer, test):
+        """
+        Run `test(question, answer)` for a code question, reusing the verdict
+        of an identical (same AST) answer graded earlier in this run.
+        """
+        def compute():
+            status = test(question, answer)
+            return status, self.reasons.get(question.number)
+
+        status, reason = VerdictCache.get_or_compute(self.cache_key(question, answer), compute)
+        if reason:
+            self.reasons[question.number] = reason
+        return status
+
+    def fail(self, question, reason):
+        """Incorrect verdict for a question whose learner code did not run."""
+        print(f"Q{question.number}: {reason}")
+        self.reasons[question.number] = reason
+        return 'Incorrect'
+
+    def multiple_choice(self):
+        """(question, submission index, solution, rule) of the multiple choice questions."""
+        return [(q.number, q.index, q.solution, q.rule) for q in self.plan.by_kind['choice']]
 
+    def check_multiple(self, submission):
+        """Grade the multiple choice answers, given in question order."""
+        for question, answer in zip(self.plan.by_kind['choice'], submission):
+            status = self.plan.grade_question(self, question, answer)
+            self.summary[status].append(question.number)
         return self.summary
 
-    def check_functions(self, s):
-        self.test_q9(s)
-        self.test_q10(s)
-        self.test_q11(s)
-        self.test_q12(s)
-        self.test_q13(s)
-        self.test_q14(s)
-
-    def __evaluate_special_cases(self, i, answer, correct_answers):
-        correct_parts = [part.upper() for part in correct_answers.split(',')]
-        submitted_parts = [part.upper() for part in answer.split(',')]
-
-        if set(submitted_parts) == set(correct_parts):
-            self.summary['Correct'].append(i)
-        elif set(submitted_parts) & set(correct_parts):
-            self.summary['Partial'].append(i)
-        else:
-            self.summary['Incorrect'].append(i)
-
-    def test_q9(self, s):
-        if s[8] == '':
-            self.summary['Not submitted'].append(9)
-            return
-        func_string = re.sub(r'^\s*def\s+(\w+)\s*\(',
-                             rf'def count_min(', s[8], count=1)
-        my_list_1 = [0, 1, 3, 2, 8, 0, 9, 10, 0, 5]
-        my_list_2 = [-3, 0, 3, 4, 2, -1, 9, 6]
-
-        local_vars = {}
-        try:
-            exec(func_string, globals(), local_vars)
-        except Exception as e:
-            print(
-                f"Q9: Error occurred while executing function count_min - {e}")
-        try:
-            count_min = local_vars['count_min']
-        except KeyError:
-            print("Q9: function count_min not found")
-            self.summary['Incorrect'].append(9)
-            return
-
-        if count_min(my_list_1) == 3 and count_min(my_list_2) == 1:
-            self.summary['Correct'].append(9)
-        else:
-            self.summary['Incorrect'].append(9)
-
-    def test_q10(self, s):
-        if s[9] == '':
-            self.summary['Not submitted'].append(10)
-            return
-
-        func_string = re.sub(r'^\s*def\s+(\w+)\s*\(',
-                             rf'def calculate_range(', s[9], count=1)
-        my_tuple_1 = (0, 1, 3, 2, 8, 0, 9, 10, 0, 5)
-        my_tuple_2 = (-3, 0, 3, 4, 2, -1, 9, 6)
+    def mark_exam(self, submission):
+        if self.scheduler is not None:
+            return self.scheduler.grade(self, submission)
+        return self.plan.grade(self, submission)
 
-        local_vars = {}
-        try:
-            exec(func_string, globals(), local_vars)
-        except Exception as e:
-            print(
-                f"Q10: Error occurred while executing function calculate_range - {e}")
-        try:
-            calculate_range = local_vars['calculate_range']
-        except KeyError:
-            print("Q10: function calculate_range not found")
-            self.summary['Incorrect'].append(10)
-            return
-
-        if calculate_range(my_tuple_1) == 10 and calculate_range(my_tuple_2) == 12:
-            self.summary['Correct'].append(10)
-        else:
-            self.summary['Incorrect'].append(10)
+    def score(self, summary=None):
+        """Points per question and final score, as an ExamScore."""
+        return self.plan.scores.score(self.summary if summary is None else summary)
 
-    def test_q11(self, s):
-        if s[10] == '':
-            self.summary['Not submitted'].append(11)
-            return
+    def display_summary(self, summary):
+        with instrument.phase('report'):
+            text = render_summary(self.exam_name, summary, self.score(summary))
+        print(text)
 
-        func_string = re.sub(r'^\s*def\s+(\w+)\s*\(',
-                             rf'def extract_email(', s[10], count=1)
-        local_vars = {}
 
-        try:
-            exec(func_string, globals(), local_vars)
-        except Exception as e:
-            print(
-                f"Q11: Error occurred while executing function extract_email - {e}")
-        try:
-            extract_email = local_vars['extract_email']
-        except KeyError:
-            print("Q11: function extract_email not found")
-            self.summary['Incorrect'].append(11)
-            return
+class M21Marker(ExamMarkerBase):
+    SPEC = 'M21'
+    # Time budget (seconds) of one test case
+    CASE_TIMEOUT = 1.0
+
+    def __init__(self, generated=0, seed=0):
+        """
+        With `generated`, each function is also tested on that many seeded
+        random cases and on a few large inputs, which flag slow functions.
+        """
+        super().__init__()
+        self.generated = generated
+        self.seed = seed
+        self.verdict_context = (generated, seed)
+        self.prepare_fixtures()
+
+    def prepare_fixtures(self):
+        self.generated_cases = {}
+        timeout = 5.0
+        if self.generated:
+            with instrument.phase('fixture'):
+                for question in self.plan.by_kind['function']:
+                    func_name = question.options['function']
+                    if CaseGenerators.available(func_name):
+                        self.generated_cases[func_name] = CaseGenerators.cases(
+                            func_name, self.seed, self.generated)
+            timeout += LARGE_CASES * self.CASE_TIMEOUT
+        # Workers fork with the generated cases, so they are not sent on every call
+        self.sandbox = Sandbox(timeout=timeout, fixtures={'generated': self.generated_cases})
+
+    def reload(self):
+        super().reload()
+        # Workers hold the cases of the previous plan
+        self.sandbox.close()
+        self.prepare_fixtures()
 
-        correct_count = 0
+    def check_functions(self, s):
+        self.plan.grade(self, s, kinds=('function',))
+
+    def test_function(self, question, answer):
+        func_name = question.options['function']
+        cases = question.options['cases']
+        generated = self.generated_cases.get(func_name)
+        # Import the learner modules here before workers fork, not in every new worker
+        learner_globals()
         try:
-            if extract_email('chinh.nguyen@coderschool.vn', True) == 'chinh.nguyen':
-                correct_count += 1
-            if extract_email('alexa1234@gmail.com', False) == 'gmail.com':
-                correct_count += 1
-            if extract_email('Joh*_D03+14/12@obviousscam.com', True) == 'Joh*_D03+14/12':
-                correct_count += 1
-        except Exception:
-            if correct_count > 0:
-                self.summary['Partial'].append(11)
-            else:
-                self.summary['Incorrect'].append(11)
-            return
-
-        if correct_count == 3:
-            self.summary['Correct'].append(11)
-        elif correct_count > 0:
-            self.summary['Partial'].append(11)
-        else:
-            self.summary['Incorrect'].append(11)
+            # One round trip runs every case, each with its own time budget
+            with instrument.phase('execute'):
+                if generated:
+                    outcome = self.sandbox.run(run_generated_cases, answer, func_name, cases,
+                                               self.CASE_TIMEOUT)
+                else:
+                    outcome = self.sandbox.run(run_function_cases, answer, func_name, cases,
+                                               self.CASE_TIMEOUT)
+        except SandboxError as e:
+            return self.fail(question, f"{func_name} - {e}")
+
+        results = outcome['cases']
+        messages = list(outcome['messages'])
+        if generated and results:
+            results, large = results[:-len(generated.large)], results[-len(generated.large):]
+            # Large inputs count when answered wrong, a timeout only flags the function
+            results += [r for r in large if r.status != TIMEOUT]
+            elapsed = sum(r.elapsed for r in large)
+            if elapsed > generated.budget or any(r.status == TIMEOUT for r in large):
+                messages.append(f"slow: {elapsed:.2f}s on large inputs "
+                                f"(budget {generated.budget:.2f}s)")
+
+        messages += failures(results)
+        for message in messages:
+            print(f"Q{question.number}: {message}")
+        if messages:
+            self.reasons[question.number] = '; '.join(messages)
+        if not outcome['found']:
+            return 'Incorrect'
+
+        ratio = pass_ratio(results)
+        if ratio == 1:
+            return 'Correct'
+        if question.options.get('partial') and ratio > 0:
+            return 'Partial'
+        return 'Incorrect'
 
-    def test_q12(self, s):
-        if s[11] == '':
-            self.summary['Not submitted'].append(12)
-            return
 
-        func_string = re.sub(r'^\s*def\s+(\w+)\s*\(',
-                             rf'def item_calculator(', s[11], count=1)
-        item_1 = {'unit_weight': 1.5, 'unit_price': 2, 'number_of_units': 5}
-        item_2 = {'unit_weight': 2.3, 'unit_price': 0.4, 'number_of_units': 3}
+class M31Marker(ExamMarkerBase):
+    SPEC = 'M31'
 
-        local_vars = {}
+    def __init__(self, concurrency=1):
+        """
+        With `concurrency` above 1, the expression questions of a submission
+        are graded side by side, on as many threads and sandbox workers.
+        """
+        super().__init__()
+        self.concurrency = 1
+        if concurrency > 1:
+            from autograde.scheduler import QuestionScheduler
+            self.scheduler = QuestionScheduler(concurrency)
+            # One sandbox worker per grading thread
+            self.concurrency = self.scheduler.workers
+        self._lock = threading.RLock()
+        self._sandbox = None
+        self.prepare_fixtures()
+
+    def prepare_fixtures(self):
+        # The dataset, references and sandbox are prepared for the first expression graded
+        self._df = None
+        self._references = None
+        if self.scheduler is not None:
+            # Every sandbox worker forks now, before the scheduler starts threads
+            self.sandbox.start()
+
+    def reload(self):
+        super().reload()
+        with self._lock:
+            # The dataset and references of the previous plan, and workers forked with them
+            if self._sandbox is not None:
+                self._sandbox.close()
+                self._sandbox = None
+            self.prepare_fixtures()
+
+    @property
+    def verdict_context(self):
+        from autograde.datasets import DatasetRegistry
+        return (DatasetRegistry.key(self.plan.fixtures['dataset']),)
+
+    @property
+    def df(self):
+        # Questions graded on several threads prepare the fixtures once
+        with self._lock:
+            if self._df is None:
+                from autograde.datasets import DatasetRegistry
+                # Prepared once and cached on disk, shared by every M3.1 marker
+                with instrument.phase('fixture'):
+                    self._df = DatasetRegistry.load(self.plan.fixtures['dataset'])
+            return self._df
+
+    @property
+    def references(self):
+        with self._lock:
+            if self._references is None:
+                from autograde.references import ReferenceStore
+                df = self.df
+                # Reference answers of the expression questions, computed once per dataset version
+                with instrument.phase('reference'):
+                    self._references = ReferenceStore.load(
+                        self.plan.fixtures['dataset'], df,
+                        {q.number: q.options['reference'] for q in self.plan.by_kind['expression']},
+                        namespace=self.exam_name)
+            return self._references
+
+    @property
+    def sandbox(self):
+        with self._lock:
+            if self._sandbox is None:
+                self._sandbox = Sandbox(workers=self.concurrency, fixtures={'df': self.df})
+            return self._sandbox
 
-        try:
-            exec(func_string, globals(), local_vars)
-        except Exception as e:
-            print(
-                f"Q12: Error occurred while executing function item_calculator - {e}")
-        try:
-            item_calculator = local_vars['item_calculator']
-        except KeyError:
-            print("Q12: function item_calculator not found")
-            self.summary['Incorrect'].append(12)
-            return
-
-        if item_calculator(item_1, True) == 7.5 and item_calculator(item_1, False) == 10:
-            self.summary['Correct'].append(12)
+    def check_expression(self, s):
+        if self.scheduler is not None:
+            self.scheduler.grade(self, s, kinds=('expression',))
         else:
-            self.summary['Incorrect'].append(12)
-
-    def test_q13(self, s):
-        receipt_1 = {
-            'milk':   {'unit_weight': 1, 'unit_price': 10, 'number_of_units': 3},
-            'rice':   {'unit_weight': 2, 'unit_price': 5, 'number_of_units': 4},
-            'cookie': {'unit_weight': 0.2, 'unit_price': 2, 'number_of_units': 10},
-            'sugar':  {'unit_weight': 0.5, 'unit_price': 7, 'number_of_units': 2},
-        }
-
-        receipt_2 = {
-            'chair': {'unit_weight': 4.5, 'unit_price': 15, 'number_of_units': 2},
-            'desk':  {'unit_weight': 10, 'unit_price': 22.5,  'number_of_units': 1}
-        }
-        if s[12] == '':
-            self.summary['Not submitted'].append(13)
-            return
-
-        func_string = re.sub(r'^\s*def\s+(\w+)\s*\(',
-                             rf'def heaviest_item(', s[12], count=1)
-        local_vars = {}
+            self.plan.grade(self, s, kinds=('expression',))
 
+    def test_expression(self, question, answer):
+        sandbox = self.sandbox
         try:
-            exec(func_string, globals(), local_vars)
-        except Exception as e:
-            print(
-                f"Q13: Error occurred while executing function heaviest_item - {e}")
-        try:
-            heaviest_item = local_vars['heaviest_item']
-        except KeyError:
-            print("Q13: function heaviest_item not found")
-            self.summary['Incorrect'].append(13)
-            return
-
-        if heaviest_item(receipt_1) == 'rice' and heaviest_item(receipt_2) == 'desk':
-            self.summary['Correct'].append(13)
-        else:
-            self.summary['Incorrect'].append(13)
-
-    def test_q14(self, s):
-        receipt_1 = {
-            'milk':   {'unit_weight': 1, 'unit_price': 10, 'number_of_units': 3},
-            'rice':   {'unit_weight': 2, 'unit_price': 5, 'number_of_units': 4},
-            'cookie': {'unit_weight': 0.2, 'unit_price': 2, 'number_of_units': 10},
-            'sugar':  {'unit_weight': 0.5, 'unit_price': 7, 'number_of_units': 2},
-        }
+            # The expression runs in a sandbox worker against its copy of df
+            with instrument.phase('execute'):
+                result = sandbox.run(eval_expression, answer)
+        except SandboxError as e:
+            return self.fail(question, str(e))
 
-        receipt_2 = {
-            'chair': {'unit_weight': 4.5, 'unit_price': 15, 'number_of_units': 2},
-            'desk':  {'unit_weight': 10, 'unit_price': 22.5,  'number_of_units': 1}
-        }
-        if s[13] == '':
-            self.summary['Not submitted'].append(14)
-            return
-
-        func_string = re.sub(r'^\s*def\s+(\w+)\s*\(',
-                             rf'def priciest_item(', s[13], count=1)
-        local_vars = {}
+        reference = self.references[question.number]
         try:
-            exec(func_string, globals(), local_vars)
+            with instrument.phase('compare'):
+                if question.options['compare'] == 'length':
+                    correct = len(reference) == len(result)
+                else:
+                    correct = reference.equals(result)
         except Exception as e:
-            print(
-                f"Q14: Error occurred while executing function priciest_item - {e}")
-
-        try:
-            priciest_item = local_vars['priciest_item']
-        except KeyError:
-            print("Q14: function priciest_item not found")
-            self.summary['Incorrect'].append(14)
-            return
-        if priciest_item(receipt_1) == 'milk' and priciest_item(receipt_2) == 'chair':
-            self.summary['Correct'].append(14)
-        else:
-            self.summary['Incorrect'].append(14)
-
-    def mark_exam(self, submission):
-        self.check_multiple(submission[:8])
-        self.check_functions(submission)
-        return self.summary
-
-    def display_summary(self, summary):
-        print(f"{self.exam_name} - EXAM SUMMARY")
-
-        score_mapping = {
-            'Correct': {range(1, 9): (4, '4/4'), range(9, 13): (12, '12/12'), range(13, 16): (10, '10/10')},
-            'Partial': {range(1, 9): (2, '2/4'), range(9, 13): (6, '6/12'), range(13, 16): (5, '5/10')},
-            'Incorrect': {range(1, 9): (0, '0/4'), range(9, 13): (0, '0/12'), range(13, 16): (0, '0/10')},
-            'Not submitted': {range(1, 9): (0, '0/4'), range(9, 13): (0, '0/12'), range(13, 16): (0, '0/10')}
-        }
-
-        final_score = 0
-
-        for status, questions in summary.items():
-            print(f"{status}: {len(questions)}")
-            for question in questions:
-                score, max_score = next(
-                    (v for k, v in score_mapping[status].items() if question in k), (0, '0/0'))
-                print(f"  - Q{question} ({score}/{max_score.split('/')[1]})")
-                final_score += score
-
-        print(f"FINAL SCORE: {final_score}/100")
-
-
-class M31Marker(ExamMarkerBase):
-    def __init__(self):
-        super().__init__()
-        self.exam_name = "M3.1"
-        self.__load_dataframe()
-
-    def __load_dataframe(self):
-
-        self.df = pd.read_csv(
-            'https://raw.githubusercontent.com/anhquan0412/dataset/main/Salaries.csv')
-        self.df.drop(columns=['Notes', 'Status', 'Agency'], inplace=True)
-        self.df['JobTitle'] = self.df['JobTitle'].str.title()
-
-    def get_solutions(self):
-        return {
-            "1": "D",
-            "2": "A",
-            "3": "A",
-            "4": "B",
-            "5": "B",
-            "6": "A",
-            "7": "C",
-            "8": "A",
-            "9": "D",
-            "10": "C",
-            "11": "A",
-            "12": "C"
-        }
-
-    def check_multiple(self, submission):
-        for i, answer in enumerate(submission, 1):
-            solution = self.solutions.get(str(i))
-            if i >= 10:
-                i += 1
-
-            if not answer:
-                self.summary['Not submitted'].append(i)
-                continue
-
-            if answer == solution:
-                self.summary['Correct'].append(i)
-            else:
-                self.summary['Incorrect'].append(i)
-
-    def check_expression(self, s):
-        self.test_q10(s)
-        self.test_q14(s)
-        self.test_q15(s)
-        self.test_q16(s)
-
-    def __exec_with_locals(self, index, df, s):
-        string = "result = " + s[index]
-
-        # Create a dictionary for local variables
-        local_vars = {'df': df}
-
-        # Execute the code with the local variables dictionary
-        exec(string, globals(), local_vars)
-        return local_vars['result']
-
-    def test_q10(self, s):
-        if s[9] == "":
-            self.summary['Not submitted'].append(10)
-            return
-        result = self.__exec_with_locals(9, self.df, s)
-        if self.df[self.df['TotalPay'] > self.df['TotalPay'].mean()].equals(result):
-            self.summary['Correct'].append(10)
-        else:
-            self.summary['Incorrect'].append(10)
-
-    def test_q14(self, s):
-        if s[13] == "":
-            self.summary['Not submitted'].append(14)
-            return
-        result = self.__exec_with_locals(13, self.df, s)
-        if self.df['JobTitle'].value_counts().head().equals(result):
-            self.summary['Correct'].append(14)
-        else:
-            self.summary['Incorrect'].append(14)
-
-    def test_q15(self, s):
-        if s[14] == "":
-            self.summary['Not submitted'].append(15)
-            return
-        result = self.__exec_with_locals(14, self.df, s)
-        df_top5 = self.df['JobTitle'].value_counts().head().index
-        if len(self.df[self.df['JobTitle'].isin(df_top5)][['Year', 'JobTitle', 'BasePay', 'OvertimePay', 'TotalPay']]) == len(result):
-            self.summary['Correct'].append(15)
-        else:
-            self.summary['Incorrect'].append(15)
-
-    def test_q16(self, s):
-        if s[15] == "":
-            self.summary['Not submitted'].append(16)
-            return
-        result = self.__exec_with_locals(15, self.df, s)
-        df_top5 = self.df['JobTitle'].value_counts().head().index
-        sample = pd.pivot_table(data=self.df[self.df['JobTitle'].isin(df_top5)],
-                                index=['JobTitle'],
-                                columns=['Year'],
-                                values=['BasePay', 'OvertimePay', 'TotalPay'])
-        if len(sample) == len(result):
-            self.summary['Correct'].append(16)
-        else:
-            self.summary['Incorrect'].append(16)
-
-    def mark_exam(self, submission):
-        self.check_multiple(submission[:9] + submission[10:13])
-        self.check_expression(submission)
-        return self.summary
-
-    def display_summary(self, summary):
-        print(f"{self.exam_name} - EXAM SUMMARY")
-
-        score_mapping = {
-            'Correct': {range(1, 10): (4, '4/4'), range(11, 14): (4, '4/4'),
-                        (10, 14, 15): (14, '14/14'), range(16, 18): (10, '10/10')},
-            'Incorrect': {range(1, 10): (0, '0/4'), range(11, 14): (0, '0/4'),
-                          (10, 14, 15): (0, '0/14'), range(16, 18): (0, '0/10')},
-            'Not submitted': {range(1, 10): (0, '0/4'), range(11, 14): (0, '0/4'),
-                              (10, 14, 15): (0, '0/14'), range(16, 18): (0, '0/10')},
-        }
-
-        final_score = 0
-
-        for status, questions in summary.items():
-            print(f"{status}: {len(questions)}")
-            for question in questions:
-                score, max_score = next(
-                    (v for k, v in score_mapping[status].items() if question in k), (0, '0/0'))
-                print(f"  - Q{question} ({score}/{max_score.split('/')[1]})")
-                final_score += score
-
-        print(f"FINAL SCORE: {final_score}/100")
+            return self.fail(question, f"Result cannot be compared - {e}")
+        return 'Correct' if correct else 'Incorrect'
 
 
 class M12Marker(ExamMarkerBase):
-    def __init__(self):
-        super().__init__()
-        self.exam_name = "M1.2"
-
-    def get_solutions(self):
-        return {
-            "1": "B",
-            "2": "B",
-            "3": "D",
-            "4": ["A", "B"],
-            "5": "D",
-            "6": ["B", "D"],
-            "7": "C",
-            "8": "B",
-            "9": ["C", "D"],
-            "10": "B",
-            "11": ["A", "B"],
-            "12": ["A", "D"],
-            "13": "3",
-            "14": "200",
-            "15": "B"
-        }
-
-    def check_multiple(self, submission):
-        for i, answer in enumerate(submission, 1):
-            solution = self.solutions.get(str(i))
-            if not answer:
-                self.summary['Not submitted'].append(i)
-                continue
-
-            if (i in {4, 6, 9, 11, 12} and answer in solution) or (answer == solution):
-                self.summary['Correct'].append(i)
-            else:
-                self.summary['Incorrect'].append(i)
-
-        return self.summary
-
-    def display_summary(self, summary):
-        print(f"{self.exam_name} - EXAM SUMMARY")
-
-        for key, value in summary.items():
-            print(f"{key}: {len(value)}")
-            for question in value:
-                if key == 'Correct':
-                    score = '10/10' if question in (6, 8, 9, 13, 14) else "5/5"
-                else:
-                    score = '0/10' if question in (6, 8, 9, 13, 14) else "0/5"
-                print(f"  - Q{question} ({score})")
-
-        final_score = sum([10 if q in (6, 8, 9, 13, 14)
-                          else 5 for q in summary.get('Correct', [])])
-        print(f"FINAL SCORE: {final_score}/100")
+    SPEC = 'M12'
 
 
 class M11Marker(ExamMarkerBase):
-    def __init__(self):
-        super().__init__()
-        self.exam_name = "M1.1"
-
-    def get_solutions(self):
-        return {
-            "1": "A",
-            "2": "B",
-            "3": "A",
-            "4": "B",
-            "5": "B",
-            "6": ["B", "D"],
-            "7": "C",
-            "8": "B",
-            "9": ["C", "D"],
-            "10": "B",
-            "11": ["A", "B"],
-            "12": ["A", "D"],
-            "13": "3",
-            "14": "200",
-            "15": "B"
-        }
-
-    def check_multiple(self, submission):
-        for i, answer in enumerate(submission, 1):
-            solution = self.solutions.get(str(i))
-            if not answer:
-                self.summary['Not submitted'].append(i)
-                continue
-
-            if answer == solution:
-                self.summary['Correct'].append(i)
-            else:
-                self.summary['Incorrect'].append(i)
-
-        return self.summary
-
-    def display_summary(self, summary):
-        print(f"{self.exam_name} - EXAM SUMMARY")
-
-        for key, value in summary.items():
-            print(f"{key}: {len(value)}")
-            for question in value:
-                if key == 'Correct':
-                    score = '2/2'
-                else:
-                    score = '0/2'
-                print(f"  - Q{question} ({score})")
-
-        final_score = sum([10 if q in (6, 8, 9, 13, 14)
-                          else 2 for q in summary.get('Correct', [])])
-        print(f"FINAL SCORE: {final_score}/100")
+    SPEC = 'M11'
 
 
 if __name__ == "__main__":
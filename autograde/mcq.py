@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+"""
+Multiple choice scoring.
+
+The grading rules are the ones the exam markers always applied:
+    - exact:   the answer is the solution, as submitted ('B', or ['B', 'D'] in
+               that order)
+    - any:     the answer is the solution or one of its options (solution
+               ['A', 'B'] accepts 'A', 'B' and ['A', 'B'])
+    - partial: comma separated letters compared as sets, ignoring case: the
+               same set is Correct, any common letter is Partial
+Answers are never stripped: ' B' is not 'B', and neither is 'A, C' 'A,C'.
+
+The partial rule works on bitmasks: 'A,C' is encoded as the mask 0b101 (A=1,
+B=2, C=4, ...), and a part that is not a single letter (' C', '') sets the
+OTHER bit, which no letter of the solution matches.
+
+Status codes index STATUSES, which follows the order of the marker summary.
+"""
+
+STATUSES = ('Not submitted', 'Incorrect', 'Partial', 'Correct')
+NOT_SUBMITTED, INCORRECT, PARTIAL, CORRECT = range(4)
+
+# Bit of the parts of an answer that are not a single letter
+OTHER = 1 << 26
+
+
+@lru_cache(maxsize=4096)
+def _encode(text):
+    mask = 0
+    for part in text.upper().split(','):
+        if len(part) == 1 and 'A' <= part <= 'Z':
+            mask |= 1 << (ord(part) - ord('A'))
+        else:
+            mask |= OTHER
+    return mask
+
+
+def encode(answer):
+    """Bitmask of the comma separated letters of an answer (a list is joined)."""
+    if isinstance(answer, (list, tuple)):
+        answer = ','.join(map(str, answer))
+    return _encode(str(answer))
+
+
+def _parts(answer):
+    if isinstance(answer, (list, tuple)):
+        answer = ','.join(map(str, answer))
+    return set(str(answer).upper().split(','))
+
+
+def grade_choice(answer, solution, rule='exact'):
+    """Status code of one answer."""
+    if not answer:
+        return NOT_SUBMITTED
+    if answer == solution:
+        return CORRECT
+
+    if rule == 'any':
+        if isinstance(solution, (list, tuple)) and answer in solution:
+            return CORRECT
+        return INCORRECT
+
+    if rule == 'partial':
+        sol = encode(solution)
+        if sol & OTHER:
+            # A solution that is not letters: compare the parts themselves
+            ans, sol = _parts(answer), _parts(solution)
+            if ans == sol:
+                return CORRECT
+            return PARTIAL if ans & sol else INCORRECT
+        ans = encode(answer)
+        if ans == sol:
+            return CORRECT
+        return PARTIAL if ans & sol else INCORRECT
+    return INCORRECT
+
+
+class MCQScorer():
+    """
+    Scores the multiple choice questions of a whole cohort at once.
+
+    `questions` is a list of (question number, submission index, solution,
+    rule), as returned by a marker's `multiple_choice()`. A cohort repeats a
+    handful of answers per question, so each distinct answer is graded once
+    with `grade_choice` and every learner giving it gets the same status.
+    """
+
+    def __init__(self, questions):
+        self.questions = [q for q, _, _, _ in questions]
+        self.indexes = [i for _, i, _, _ in questions]
+        self.rules = [(solution, rule) for _, _, solution, rule in questions]
+
+    def score(self, submissions):
+        """(n_learners, n_questions) status codes of the cohort answers."""
+        import numpy as np
+
+        statuses = np.empty((len(submissions), len(self.indexes)), dtype=np.int8)
+        for column, (index, (solution, rule)) in enumerate(zip(self.indexes, self.rules)):
+            # Status of every distinct text answer; other answers (lists) are
+            # graded one by one
+            graded = {}
+            codes = []
+            for submission in submissions:
+                answer = submission[index] if index < len(submission) else ''
+                if type(answer) is str:
+                    code = graded.get(answer)
+                    if code is None:
+                        code = graded[answer] = grade_choice(answer, solution, rule)
+                else:
+                    code = grade_choice(answer, solution, rule)
+                codes.append(code)
+            statuses[:, column] = codes
+        return statuses
+
+    def summaries(self, statuses):
+        """Marker-style summaries ({status: [questions]}) from status codes."""
+        summaries = []
+        for row in statuses.tolist():
+            summary = {status: [] for status in STATUSES}
+            for question, code in zip(self.questions, row):
+                summary[STATUSES[code]].append(question)
+            summaries.append(summary)
+        return summaries
@@ -0,0 +1,32 @@
+import contextlib
+import os
+import threading
+
+
+def cache_dir(*parts):
+    """
+    Directory for files autograde keeps between runs (datasets, reference
+    outputs, downloaded submissions). Set AUTOGRADE_CACHE_DIR to move it.
+    """
+    root = os.environ.get('AUTOGRADE_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'autograde')
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """
+    Temporary path to write `path` through. The file appears at `path`,
+    complete, when the block exits without error: other processes may be
+    reading the cache while it is written. The temporary file is removed
+    when the block fails.
+    """
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
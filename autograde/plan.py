@@ -0,0 +1,222 @@
+import json
+import os
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from autograde import instrument
+from autograde.fingerprint import fingerprint
+from autograde.mcq import STATUSES, grade_choice
+
+"""
+Exam specs and grading plans.
+
+An exam spec (autograde/specs/<name>.json, or YAML when PyYAML is installed)
+lists every question with its type, solution, grading rule, points and the
+fixtures it needs:
+
+    {
+      "exam": "M2.1",
+      "total": 100,
+      "fixtures": {"receipt_1": {...}},
+      "questions": [
+        {"number": 3, "type": "choice", "solution": "c,e", "rule": "partial",
+         "points": {"Correct": 4, "Partial": 2}},
+        {"number": 9, "type": "function", "function": "count_min",
+         "cases": [{"args": [[0, 1, 0]], "expected": 2}], "points": 12},
+        ...
+      ]
+    }
+
+Question types are `choice` (rules exact, any, partial), `sql`, `function` and
+`expression`. In function cases, {"$tuple": [...]} is a tuple and
+{"$fixture": name} is a value of the spec fixtures. SQL questions take the
+options of `Utils.check_sql` in "compare", e.g. {"order": "multiset"} to accept
+rows in any order. "defaults" gives options shared by every question of a
+type, e.g. {"sql": {"compare": {"order": "auto"}}}.
+
+A spec is compiled once per process into an immutable GradingPlan: questions
+are resolved, test cases decoded and each question bound to its grading
+function, so grading a submission is a single loop over the plan.
+"""
+
+SPEC_DIR = os.path.join(os.path.dirname(__file__), 'specs')
+
+Question = namedtuple(
+    'Question', ['number', 'index', 'kind', 'solution', 'rule', 'points', 'options'])
+
+
+class SpecError(Exception):
+    """An exam spec is malformed."""
+
+
+def _decode(value, fixtures):
+    if isinstance(value, dict):
+        if '$tuple' in value:
+            return tuple(_decode(v, fixtures) for v in value['$tuple'])
+        if '$fixture' in value:
+            return fixtures[value['$fixture']]
+        return {k: _decode(v, fixtures) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v, fixtures) for v in value]
+    return value
+
+
+def _grade_choice(marker, question, answer):
+    return STATUSES[grade_choice(answer, question.solution, question.rule)]
+
+
+def _grade_sql(marker, question, answer):
+    if not answer:
+        return 'Not submitted'
+    # SQL comparison needs pandas, imported with the first SQL answer
+    from autograde.utils import Utils
+    correct = Utils.check_sql(answer, question.solution, marker.conn, cache=True,
+                              **question.options.get('compare', {}))
+    return 'Correct' if correct is True else 'Incorrect'
+
+
+def _grade_function(marker, question, answer):
+    if not answer:
+        return 'Not submitted'
+    return marker.run_cached(question, answer, marker.test_function)
+
+
+def _grade_expression(marker, question, answer):
+    if not answer:
+        return 'Not submitted'
+    return marker.run_cached(question, answer, marker.test_expression)
+
+
+HANDLERS = {
+    'choice': _grade_choice,
+    'sql': _grade_sql,
+    'function': _grade_function,
+    'expression': _grade_expression,
+}
+
+
+def load_spec(name):
+    """Read a spec by name (autograde/specs/<name>.json) or by path."""
+    path = name
+    if not os.path.exists(path):
+        path = os.path.join(SPEC_DIR, f'{name}.json')
+
+    with open(path, 'r') as file:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            return yaml.safe_load(file)
+        return json.load(file)
+
+
+def compile_spec(spec):
+    fixtures = spec.get('fixtures', {})
+
+    solutions = {}
+    if 'solutions_file' in spec:
+        with open(spec['solutions_file'], 'r') as file:
+            solutions = json.load(file)
+
+    defaults = spec.get('defaults', {})
+    questions = []
+    for item in spec['questions']:
+        number = item['number']
+        kind = item.get('type', 'choice')
+        if kind not in HANDLERS:
+            raise SpecError(f"Q{number}: unknown question type '{kind}'")
+        item = {**defaults.get(kind, {}), **item}
+
+        solution = item.get('solution', solutions.get(str(number)))
+        points = item.get('points', 0)
+        if not isinstance(points, dict):
+            points = {'Correct': points}
+
+        options = {k: v for k, v in item.items() if k not in (
+            'number', 'index', 'type', 'solution', 'rule', 'points')}
+        if 'cases' in options:
+            options['cases'] = tuple(
+                (tuple(_decode(case['args'], fixtures)), _decode(case['expected'], fixtures))
+                for case in options['cases'])
+
+        questions.append(Question(
+            number=number,
+            index=item.get('index', number - 1),
+            kind=kind,
+            solution=solution,
+            rule=item.get('rule', 'exact'),
+            points=(points.get('Correct', 0), points.get('Partial', 0)),
+            options=MappingProxyType(options),
+        ))
+
+    return GradingPlan(spec['exam'], questions, spec.get('total', 100), fixtures)
+
+
+class GradingPlan():
+    """Compiled, read-only grading plan of one exam."""
+
+    def __init__(self, exam, questions, total, fixtures):
+        self.exam = exam
+        self.total = total
+        self.fixtures = MappingProxyType(fixtures)
+        self.questions = tuple(sorted(questions, key=lambda q: q.number))
+        self.by_number = MappingProxyType({q.number: q for q in self.questions})
+        self.by_kind = MappingProxyType({
+            kind: tuple(q for q in self.questions if q.kind == kind) for kind in HANDLERS})
+        self._steps = tuple((q, HANDLERS[q.kind]) for q in self.questions)
+        self._scores = None
+
+    @property
+    def scores(self):
+        """ScoreTable of the plan, built the first time it is needed."""
+        if self._scores is None:
+            from autograde.scoring import ScoreTable
+            self._scores = ScoreTable(
+                self.exam, [(q.number, *q.points) for q in self.questions], self.total)
+        return self._scores
+
+    def solutions(self):
+        return {str(q.number): q.solution for q in self.questions}
+
+    def grade(self, marker, submission, kinds=None):
+        """Grade a full submission (or only the questions of `kinds`) into the marker summary."""
+        steps = self._steps
+        if kinds is not None:
+            steps = tuple(step for step in steps if step[0].kind in kinds)
+
+        summary = marker.summary
+        timings = marker.timings
+        tagged = instrument.enabled()
+        for question, handler in steps:
+            answer = submission[question.index] if question.index < len(submission) else ''
+            start = time.perf_counter()
+            if tagged:
+                with instrument.question(self.exam, question.number):
+                    status = handler(marker, question, answer)
+            else:
+                status = handler(marker, question, answer)
+            summary[status].append(question.number)
+            timings[question.number] = time.perf_counter() - start
+        return summary
+
+    def grade_question(self, marker, question, answer):
+        with instrument.question(self.exam, question.number):
+            return HANDLERS[question.kind](marker, question, answer)
+
+
+def question_hash(question):
+    """Hash of everything of a question that decides a verdict (not its points)."""
+    options = sorted((k, v) for k, v in question.options.items())
+    return fingerprint(repr((question.kind, question.solution, question.rule, options)))
+
+
+_plans = {}
+
+
+def load_plan(name, reload=False):
+    """
+    Compiled plan of an exam spec, shared by the whole process. With
+    `reload`, the spec is read and compiled again (e.g. after an answer key
+    was edited).
+    """
+    if reload or name not in _plans:
+        _plans[name] = compile_spec(load_spec(name))
+    return _plans[name]
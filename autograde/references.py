@@ -0,0 +1,63 @@
+import hashlib
+import marshal
+import os
+import pandas as pd
+from autograde.compiler import compile_expression
+from autograde.datasets import DatasetRegistry
+from autograde.paths import atomic_path, cache_dir
+
+
+def _code_hash(compute):
+    # A reference computed by edited code must not be reused
+    code = compute.encode('utf-8') if isinstance(compute, str) else marshal.dumps(compute.__code__)
+    return hashlib.sha1(code).hexdigest()[:12]
+
+
+def _evaluate(compute, df):
+    if isinstance(compute, str):
+        return eval(compile_expression(compute), {'pd': pd}, {'df': df})
+    return compute(df)
+
+
+class ReferenceStore():
+    """
+    Reference answers of dataset questions, computed once per dataset version.
+
+    Results are memoized in the process (every marker instance shares them,
+    forked workers inherit them) and pickled to the cache directory, so other
+    worker processes load them instead of recomputing.
+    """
+
+    _results = {}
+
+    @classmethod
+    def load(cls, dataset, df, references, namespace=''):
+        """
+        Return {name: result} for `references` ({name: function(df) or an
+        expression over df}) computed over `df`, the prepared frame of
+        `dataset`. `namespace` (e.g. the exam name) keeps the names of
+        different exams apart.
+        """
+        version = DatasetRegistry.key(dataset)
+        results = {}
+        for name, compute in references.items():
+            key = (dataset, version, namespace, str(name), _code_hash(compute))
+            if key not in cls._results:
+                cls._results[key] = cls._load_or_compute(key, compute, df)
+            results[name] = cls._results[key]
+        return results
+
+    @classmethod
+    def _load_or_compute(cls, key, compute, df):
+        path = os.path.join(cache_dir('references'), '-'.join(key).replace('.', '') + '.pkl')
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+
+        result = _evaluate(compute, df)
+        with atomic_path(path) as tmp_path:
+            pd.to_pickle(result, tmp_path)
+        return result
+
+    @classmethod
+    def clear(cls):
+        cls._results.clear()
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from autograde import instrument
+from autograde.mcq import STATUSES
+from autograde.scoring import ExamScore, QuestionScore
+
+"""
+Grading results as a table.
+
+A ResultsSink collects one row per (learner, question): verdict, points, time
+spent and the reason of a failure. Cohort results are written in bulk, with a
+single write per batch, as CSV, JSONL or Parquet. The text summary markers
+print is rendered from the same data.
+"""
+
+COLUMNS = ('exam', 'learner', 'question', 'status', 'points', 'max_points', 'elapsed', 'reason')
+
+
+def render_summary(exam, summary, score):
+    """The text summary of one learner, as printed by `display_summary`."""
+    lines = [f"{exam} - EXAM SUMMARY"]
+    for status, questions in summary.items():
+        lines.append(f"{status}: {len(questions)}")
+        for number in questions:
+            question = score.questions[number]
+            lines.append(f"  - Q{number} ({question.points:g}/{question.max_points:g})")
+    lines.append(f"FINAL SCORE: {score.total:g}/{score.max_total}")
+    return '\n'.join(lines)
+
+
+class ResultsSink():
+    def __init__(self):
+        self.columns = {column: [] for column in COLUMNS}
+        self.max_totals = {}
+
+    def __len__(self):
+        return len(self.columns['question'])
+
+    def add(self, learner, score, reasons=None, timings=None):
+        """Add the rows of one learner from an ExamScore."""
+        reasons = reasons or {}
+        timings = timings or {}
+        self.max_totals[score.exam] = score.max_total
+
+        columns = self.columns
+        for number, question in score.questions.items():
+            columns['exam'].append(score.exam)
+            columns['learner'].append(learner)
+            columns['question'].append(number)
+            columns['status'].append(question.status)
+            columns['points'].append(question.points)
+            columns['max_points'].append(question.max_points)
+            columns['elapsed'].append(timings.get(number))
+            columns['reason'].append(reasons.get(number))
+
+    def add_marker(self, learner, marker):
+        self.add(learner, marker.score(), marker.reasons, marker.timings)
+
+    def add_cohort(self, report):
+        """Add the results of `grade_cohort`."""
+        for result in report['results']:
+            if result['score'] is not None:
+                self.add(result['learner'], result['score'],
+                         result['reasons'], result['timings'])
+
+    def rows(self):
+        return zip(*(self.columns[column] for column in COLUMNS))
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns, columns=COLUMNS)
+
+    def write(self, path, format=None):
+        """Write every row to `path` as csv, jsonl or parquet (from the extension by default)."""
+        with instrument.phase('report'):
+            self._write(path, format or path.rsplit('.', 1)[-1].lower())
+
+    def _write(self, path, format):
+        if format == 'parquet':
+            self.to_frame().to_parquet(path, index=False)
+            return
+
+        buffer = io.StringIO()
+        if format == 'csv':
+            writer = csv.writer(buffer)
+            writer.writerow(COLUMNS)
+            writer.writerows(self.rows())
+        elif format in ('jsonl', 'ndjson'):
+            for row in self.rows():
+                buffer.write(json.dumps(dict(zip(COLUMNS, row)), default=str))
+                buffer.write('\n')
+        else:
+            raise ValueError(f"Unknown results format '{format}'")
+
+        with open(path, 'w', newline='') as file:
+            file.write(buffer.getvalue())
+
+    def render_text(self, learner):
+        """Text summary of one learner, rebuilt from the collected rows."""
+        rows = [row for row in self.rows() if row[1] == learner]
+        if not rows:
+            raise KeyError(learner)
+
+        exam = rows[0][0]
+        summary = {status: [] for status in STATUSES}
+        questions = {}
+        for _, _, number, status, points, max_points, _, _ in rows:
+            summary[status].append(number)
+            questions[number] = QuestionScore(number, status, points, max_points)
+        score = ExamScore(exam, questions, sum(q.points for q in questions.values()),
+                          self.max_totals[exam])
+        return render_summary(exam, summary, score)
@@ -0,0 +1,202 @@
+import multiprocessing
+import os
+import queue
+import threading
+from autograde import instrument
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+"""
+Run learner code away from the grader process.
+
+A Sandbox keeps a few pre-forked worker processes. Each call ships a task (a
+module-level function and its arguments) to an idle worker and waits for the
+answer with a wall-clock limit. Workers run with an address-space limit, so
+runaway allocations fail inside the worker. A worker that times out, runs out
+of memory or dies is killed and replaced, the others are reused across calls.
+"""
+
+
+class SandboxError(Exception):
+    """Learner code timed out, ran out of memory, crashed or raised."""
+
+
+def _memory_in_use():
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _worker_main(conn, memory_limit, fixtures):
+    # Learner code runs here, the grader's sinks stay in the grader process
+    instrument.reset()
+    if resource is not None and memory_limit:
+        # The forked worker already maps the grader's memory, the limit applies
+        # on top of it
+        limit = _memory_in_use() + memory_limit
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            task, args = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        try:
+            reply = ('ok', task(fixtures, *args))
+        except MemoryError:
+            reply = ('memory', None)
+        except BaseException as e:
+            reply = ('error', f"{type(e).__name__}: {e}")
+
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send(('error', f"Result could not be sent back: {e}"))
+
+        if reply[0] == 'memory':
+            break
+
+
+class _Worker():
+    def __init__(self, context, memory_limit, fixtures):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit, fixtures), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+
+class Sandbox():
+    """
+    Pool of isolated workers for learner code.
+
+    `fixtures` (e.g. a DataFrame) are inherited by the workers when they are
+    forked and passed as the first argument of every task. Where fork is not
+    available, tasks run in the grader process without limits.
+
+    Workers are forked on demand, or all at once by `start`: a sandbox used
+    from several threads should be started before the threads are, since
+    forking a process that runs threads can copy locks they hold.
+    """
+
+    # Seconds between checks for a free worker slot while every worker is busy
+    ACQUIRE_POLL = 0.1
+
+    def __init__(self, workers=1, timeout=5.0, memory_limit=512 * 2**20, fixtures=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.fixtures = fixtures if fixtures is not None else {}
+        self.isolated = self.available()
+
+        self._idle = queue.LifoQueue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available():
+        return 'fork' in multiprocessing.get_all_start_methods()
+
+    def start(self):
+        """Fork every worker now, before the grader starts threads."""
+        if self.isolated:
+            with self._lock:
+                while self._started < self.workers:
+                    self._idle.put(self._fork())
+        return self
+
+    def _fork(self):
+        # Called with the lock held
+        self._started += 1
+        try:
+            return _Worker(multiprocessing.get_context('fork'), self.memory_limit, self.fixtures)
+        except Exception:
+            self._started -= 1
+            raise
+
+    def _acquire(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if self._started < self.workers:
+                        return self._fork()
+                try:
+                    worker = self._idle.get(timeout=self.ACQUIRE_POLL)
+                except queue.Empty:
+                    # A discarded worker frees its slot without coming back
+                    # idle, check again for a slot to fork a replacement in
+                    continue
+            if worker.is_alive():
+                return worker
+            self._discard(worker)
+
+    def _discard(self, worker):
+        instrument.count('sandbox.restart')
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+
+    def run(self, task, *args, timeout=None):
+        """
+        Run `task(fixtures, *args)` in a worker and return its result.
+        Raises SandboxError with the reason when the call does not complete.
+        """
+        if not self.isolated:
+            try:
+                return task(self.fixtures, *args)
+            except Exception as e:
+                raise SandboxError(f"{type(e).__name__}: {e}") from e
+
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        try:
+            worker.conn.send((task, args))
+        except (EOFError, OSError):
+            self._discard(worker)
+            raise SandboxError(f"Worker crashed (exit code {worker.process.exitcode})")
+        except Exception as e:
+            self._idle.put(worker)
+            raise SandboxError(f"Task could not be sent to the worker: {e}")
+
+        try:
+            if not worker.conn.poll(timeout):
+                self._discard(worker)
+                raise SandboxError(f"Timed out after {timeout:g}s")
+            status, value = worker.conn.recv()
+        except (EOFError, OSError):
+            self._discard(worker)
+            raise SandboxError(f"Worker crashed (exit code {worker.process.exitcode})")
+
+        if status == 'memory':
+            self._discard(worker)
+            raise SandboxError(
+                f"Ran out of memory (limit {self.memory_limit // 2**20} MB)")
+
+        self._idle.put(worker)
+        if status == 'error':
+            raise SandboxError(value)
+        return value
+
+    def close(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(worker)
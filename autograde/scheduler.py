@@ -0,0 +1,159 @@
+import atexit
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from autograde.paths import atomic_path, cache_dir
+
+"""
+Concurrent grading of the questions of one submission.
+
+SQLite queries and pandas operations release the GIL for most of their work,
+and sandboxed learner code runs in other processes, so the SQL and expression
+questions of a single learner can be graded side by side on a thread pool.
+Each thread grades with its own database connection (ConnectionProvider
+connections are per thread).
+
+Questions are submitted longest expected first, from the grading times of
+past submissions, so a slow question does not start last and hold back the
+whole submission. Statuses are merged into the marker summary in question
+order once every question is graded: the summary is the same as sequential
+grading, whatever order the threads finish in.
+
+    marker = M31Marker(concurrency=4)
+    marker.mark_exam(submission)
+"""
+
+# Questions cheaper than a thread hand-off are graded inline
+INLINE_KINDS = ('choice',)
+
+
+class TimingHistory():
+    """
+    Expected grading time of every (exam, question): an exponentially
+    weighted mean of past grading times, kept in the cache directory so
+    the next session starts with them. The file is written at most every
+    SAVE_INTERVAL seconds, on `flush` and when the process exits.
+    """
+
+    # Weight of the latest grading time
+    ALPHA = 0.3
+    # Seconds between two writes of the history file
+    SAVE_INTERVAL = 30.0
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir('timings'), 'questions.json')
+        self._means = None
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def _load(self):
+        if self._means is None:
+            try:
+                with open(self.path, 'r') as file:
+                    self._means = json.load(file)
+            except (OSError, ValueError):
+                self._means = {}
+        return self._means
+
+    def expected(self, exam, numbers):
+        """
+        {question: expected seconds}. Questions without history are expected
+        to be as slow as the slowest known one, so they start early.
+        """
+        means = self._load().get(exam, {})
+        default = max(means.values(), default=1.0)
+        return {number: means.get(str(number), default) for number in numbers}
+
+    def update(self, exam, timings):
+        """Fold {question: seconds} of one submission into the history."""
+        with self._lock:
+            means = self._load().setdefault(exam, {})
+            for number, seconds in timings.items():
+                key = str(number)
+                previous = means.get(key)
+                means[key] = seconds if previous is None else (
+                    self.ALPHA * seconds + (1 - self.ALPHA) * previous)
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= self.SAVE_INTERVAL:
+                self._save()
+
+    def flush(self):
+        """Write the history if it changed since it was last written."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        # Called with the lock held
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        try:
+            with atomic_path(self.path) as tmp_path, open(tmp_path, 'w') as file:
+                json.dump(self._means, file)
+        except OSError:
+            # The history only orders questions, grading goes on without it
+            pass
+
+
+class QuestionScheduler():
+    """
+    Grades the questions of a submission on `workers` threads, at most one
+    per CPU: with a single CPU, questions are graded in order.
+    """
+
+    def __init__(self, workers=4, history=None):
+        self.workers = max(1, min(workers, os.cpu_count() or 1))
+        self.history = history or TimingHistory()
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='autograde-question')
+        return self._executor
+
+    def order(self, exam, questions):
+        """Questions longest expected first (question order among equals)."""
+        expected = self.history.expected(exam, [q.number for q in questions])
+        return sorted(questions, key=lambda q: -expected[q.number])
+
+    @staticmethod
+    def _grade(plan, marker, question, answer):
+        start = time.perf_counter()
+        status = plan.grade_question(marker, question, answer)
+        marker.timings[question.number] = time.perf_counter() - start
+        return status
+
+    def grade(self, marker, submission, kinds=None):
+        """Like `GradingPlan.grade`: grade a submission into the marker summary."""
+        plan = marker.plan
+        questions = [q for q in plan.questions if kinds is None or q.kind in kinds]
+        concurrent = [q for q in questions if q.kind not in INLINE_KINDS]
+        if self.workers <= 1 or len(concurrent) <= 1:
+            return plan.grade(marker, submission, kinds)
+
+        def answer(question):
+            return submission[question.index] if question.index < len(submission) else ''
+
+        futures = [(q, self.executor.submit(self._grade, plan, marker, q, answer(q)))
+                   for q in self.order(plan.exam, concurrent)]
+        statuses = {q.number: self._grade(plan, marker, q, answer(q))
+                    for q in questions if q.kind in INLINE_KINDS}
+        for question, future in futures:
+            statuses[question.number] = future.result()
+
+        for question in questions:
+            marker.summary[statuses[question.number]].append(question.number)
+        self.history.update(plan.exam, {q.number: marker.timings[q.number] for q in concurrent})
+        return marker.summary
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.history.flush()
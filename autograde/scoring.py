@@ -0,0 +1,95 @@
+from collections import namedtuple
+from autograde.mcq import CORRECT, NOT_SUBMITTED, PARTIAL, STATUSES
+
+"""
+Scores from grading summaries.
+
+A ScoreTable holds the points of every (question, status) pair of an exam in a
+dense table, so looking up a question's points is a single index. Scoring one
+learner is plain Python; the final scores of a whole cohort are one NumPy
+gather and one sum over a status matrix, NumPy being imported with the first
+cohort scored so multiple choice grading stays free of it.
+"""
+
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+QuestionScore = namedtuple('QuestionScore', ['question', 'status', 'points', 'max_points'])
+
+# `questions` maps question number -> QuestionScore, in question order
+ExamScore = namedtuple('ExamScore', ['exam', 'questions', 'total', 'max_total'])
+
+
+class ScoreTable():
+    def __init__(self, exam, questions, total):
+        """`questions` is a list of (question number, correct points, partial points)."""
+        self.exam = exam
+        self.total = total
+        self.numbers = [number for number, _, _ in questions]
+        self.columns = {number: column for column, number in enumerate(self.numbers)}
+
+        # rows[column][status code]
+        self.rows = []
+        for _, correct, partial in questions:
+            row = [0.0] * len(STATUSES)
+            row[CORRECT] = float(correct)
+            row[PARTIAL] = float(partial)
+            self.rows.append(row)
+        self.max_points = [row[CORRECT] for row in self.rows]
+        self._points = None
+
+    @property
+    def points(self):
+        """points[column, status code] as an array, built for the first cohort scored."""
+        if self._points is None:
+            import numpy as np
+            self._points = np.array(self.rows, dtype=np.float64).reshape(
+                len(self.rows), len(STATUSES))
+        return self._points
+
+    def question_points(self, number, status):
+        return self.rows[self.columns[number]][STATUS_CODES[status]]
+
+    def status_codes(self, summary):
+        """Status codes of one summary, one per question (Not submitted when missing)."""
+        codes = [NOT_SUBMITTED] * len(self.numbers)
+        for status, numbers in summary.items():
+            code = STATUS_CODES[status]
+            for number in numbers:
+                codes[self.columns[number]] = code
+        return codes
+
+    def status_row(self, summary):
+        """`status_codes` of one summary as an array."""
+        import numpy as np
+        return np.array(self.status_codes(summary), dtype=np.int8)
+
+    def status_matrix(self, summaries):
+        """(n_learners, n_questions) status codes of a cohort."""
+        import numpy as np
+        matrix = np.full((len(summaries), len(self.numbers)), NOT_SUBMITTED, dtype=np.int8)
+        for row, summary in enumerate(summaries):
+            matrix[row] = self.status_codes(summary)
+        return matrix
+
+    def cohort_points(self, statuses):
+        """(n_learners, n_questions) points of a status matrix."""
+        import numpy as np
+        return self.points[np.arange(len(self.numbers)), statuses]
+
+    def cohort_totals(self, statuses):
+        """Final score of every learner of a status matrix."""
+        return self.cohort_points(statuses).sum(axis=1)
+
+    def score(self, summary):
+        """ExamScore of one summary, without NumPy."""
+        questions = {}
+        total = 0.0
+        for number, code, row, max_points in zip(
+                self.numbers, self.status_codes(summary), self.rows, self.max_points):
+            questions[number] = QuestionScore(number, STATUSES[code], row[code], max_points)
+            total += row[code]
+        return ExamScore(self.exam, questions, total, self.total)
+
+    def score_cohort(self, summaries):
+        """Final scores of a cohort of summaries as an array."""
+        return self.cohort_totals(self.status_matrix(summaries))
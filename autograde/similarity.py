@@ -0,0 +1,333 @@
+import builtins
+import io
+import keyword
+import tokenize
+import zlib
+import numpy as np
+from autograde.fingerprint import SQL_KEYWORDS, SQL_TOKEN
+from autograde.plan import load_plan
+
+"""
+Near-duplicate code and SQL answers across a cohort.
+
+Each answer becomes a set of shingles, runs of SHINGLE_SIZE tokens in which
+identifiers are renamed in order of appearance (Python names, SQL aliases),
+so renaming variables or reformatting does not hide a copy. A MinHash
+signature of the set estimates the Jaccard similarity of two answers, and LSH
+banding puts signatures that agree on a whole band in the same bucket, so
+finding the similar answers of a new one only looks at its buckets instead
+of every answer graded before.
+
+Identical signatures share a group, so a cohort where hundreds of learners
+wrote the same answer costs one comparison per new learner, not hundreds.
+
+    similarity = CohortSimilarity('M21')
+    for learner, answers in read_submissions('M21-export.jsonl'):
+        similarity.add(learner, answers)
+    print(similarity.render())
+"""
+
+SHINGLE_SIZE = 4
+NUM_PERM = 128
+THRESHOLD = 0.8
+# Answers shorter than this (in tokens) are too common to tell copies apart
+MIN_TOKENS = 10
+
+# Stands for the reference answer of a question in the clusters
+SOLUTION = '<solution>'
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+BUILTINS = frozenset(dir(builtins))
+SKIPPED_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER}
+
+
+def python_tokens(source):
+    """
+    Tokens of Python source, names renamed v0, v1, ... in order of
+    appearance (keywords, builtins and attributes are kept). Source that
+    does not tokenize keeps the tokens read before the error.
+    """
+    names = {}
+    tokens = []
+    previous = None
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            kind, text = token.type, token.string
+            if kind in SKIPPED_TOKENS:
+                continue
+            if kind == tokenize.NAME and previous != '.' and not keyword.iskeyword(text) \
+                    and text not in BUILTINS:
+                text = names.setdefault(text, f'v{len(names)}')
+            elif kind in (tokenize.INDENT, tokenize.DEDENT, tokenize.NEWLINE):
+                text = tokenize.tok_name[kind]
+            tokens.append(text)
+            previous = token.string
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass
+    return tokens
+
+
+def sql_tokens(query):
+    """
+    Tokens of a SQL query: comments dropped, keywords upper-cased, other
+    words lower-cased and aliases (AS name, or a name after a table) renamed
+    a0, a1, ... in order of declaration, wherever they are used.
+    """
+    tokens = []
+    for match in SQL_TOKEN.finditer(query):
+        kind, token = match.lastgroup, match.group()
+        if kind in ('comment', 'space'):
+            continue
+        if kind == 'word':
+            token = token.upper() if token.upper() in SQL_KEYWORDS else token.lower()
+        tokens.append(token)
+
+    aliases = {}
+    for i, token in enumerate(tokens):
+        if token in SQL_KEYWORDS or token in aliases:
+            continue
+        if not (token[0].isalpha() or token[0] in '_"`['):
+            continue
+        # column AS alias, FROM table alias, JOIN table alias
+        if (i >= 1 and tokens[i - 1] == 'AS') or (
+                i >= 2 and tokens[i - 2] in ('FROM', 'JOIN') and tokens[i - 1][0].isalpha()):
+            aliases[token] = f'a{len(aliases)}'
+    return [aliases.get(token, token) for token in tokens if token != ';']
+
+
+TOKENIZERS = {
+    'sql': sql_tokens,
+    'function': python_tokens,
+    'expression': python_tokens,
+}
+
+
+def shingles(tokens, size=SHINGLE_SIZE):
+    """32-bit hashes of the runs of `size` tokens."""
+    if len(tokens) <= size:
+        grams = [tokens] if tokens else []
+    else:
+        grams = (tokens[i:i + size] for i in range(len(tokens) - size + 1))
+    return {zlib.crc32('\x1f'.join(gram).encode('utf-8')) for gram in grams}
+
+
+def bands_for(threshold, num_perm):
+    """
+    (bands, rows) splitting `num_perm` whose LSH threshold (1/bands)^(1/rows)
+    is the closest at or below `threshold`, so few similar pairs are missed;
+    candidates are then checked against the threshold on their signatures.
+    """
+    best = (num_perm, 1)
+    best_threshold = 0.0
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        estimate = (1 / bands) ** (1 / rows)
+        if best_threshold < estimate <= threshold:
+            best, best_threshold = (bands, rows), estimate
+    return best
+
+
+class MinHasher():
+    """MinHash signatures of shingle sets, under `num_perm` seeded hash functions."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        # Below 2**32, so a * hash + b fits in 64 bits for 32-bit hashes
+        self.a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, hashes):
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        if not len(values):
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        permuted = (np.outer(self.a, values) + self.b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+class LSHIndex():
+    """
+    Banded LSH over MinHash signatures, filled incrementally. Identical
+    signatures share one group id.
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM):
+        self.threshold = threshold
+        self.bands, self.rows = bands_for(threshold, num_perm)
+        self.signatures = []
+        self._groups = {}
+        self._buckets = [{} for _ in range(self.bands)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature):
+        """[(group, estimated similarity)] of the groups at or above the threshold."""
+        candidates = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        if not candidates:
+            return []
+
+        candidates = sorted(candidates)
+        similarities = (np.stack([self.signatures[g] for g in candidates]) == signature).mean(axis=1)
+        return [(group, float(similarity)) for group, similarity in zip(candidates, similarities)
+                if similarity >= self.threshold]
+
+    def add(self, signature):
+        """
+        Group of the signature and [(group, similarity)] of the groups inserted
+        before that it is similar to. A signature already in the index joins
+        its group, returned with similarity 1.
+        """
+        exact = signature.tobytes()
+        group = self._groups.get(exact)
+        if group is not None:
+            return group, [(group, 1.0)]
+
+        matches = self.query(signature)
+        group = len(self.signatures)
+        self.signatures.append(signature)
+        self._groups[exact] = group
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(group)
+        return group, matches
+
+
+class CohortSimilarity():
+    """
+    Near-duplicate answers of every code question (sql, function, expression)
+    of an exam, added learner by learner as submissions come in.
+
+    `plan` is a GradingPlan or the name of an exam spec. Reference answers of
+    the spec are added first, clusters holding one are flagged as matching
+    the solution: correct answers of a short question are expected to look
+    alike.
+    """
+
+    def __init__(self, plan, threshold=THRESHOLD, num_perm=NUM_PERM,
+                 shingle_size=SHINGLE_SIZE, min_tokens=MIN_TOKENS, seed=1):
+        self.plan = load_plan(plan) if isinstance(plan, str) else plan
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+        self.hasher = MinHasher(num_perm, seed)
+        self.questions = [q for q in self.plan.questions if q.kind in TOKENIZERS]
+
+        self._indexes = {}
+        # Per question: learners of each group, union-find parents of the
+        # groups and the similar group pairs found
+        self._members = {}
+        self._parents = {}
+        self._edges = {}
+        for question in self.questions:
+            self._indexes[question.number] = LSHIndex(threshold, num_perm)
+            self._members[question.number] = []
+            self._parents[question.number] = []
+            self._edges[question.number] = []
+
+            reference = question.solution or question.options.get('reference')
+            if isinstance(reference, str):
+                self._insert(question, SOLUTION, reference)
+
+    def _find(self, parents, group):
+        while parents[group] != group:
+            parents[group] = parents[parents[group]]
+            group = parents[group]
+        return group
+
+    def _insert(self, question, learner, answer):
+        tokens = TOKENIZERS[question.kind](str(answer))
+        if len(tokens) < self.min_tokens:
+            return []
+
+        signature = self.hasher.signature(shingles(tokens, self.shingle_size))
+        number = question.number
+        group, matches = self._indexes[number].add(signature)
+
+        members, parents = self._members[number], self._parents[number]
+        if group == len(members):
+            members.append([])
+            parents.append(group)
+        members[group].append(learner)
+
+        for other, similarity in matches:
+            if other != group:
+                self._edges[number].append((other, group, similarity))
+                parents[self._find(parents, other)] = self._find(parents, group)
+        return [(members[other][0], similarity) for other, similarity in matches
+                if members[other][0] != learner]
+
+    def add(self, learner, submission):
+        """
+        Add the answers of one learner. Returns {question: [(learner, similarity)]}
+        of the answers added before that this learner's answers are similar to,
+        one learner per group of identical answers.
+        """
+        found = {}
+        for question in self.questions:
+            if question.index >= len(submission) or not submission[question.index]:
+                continue
+            matches = self._insert(question, learner, submission[question.index])
+            if matches:
+                found[question.number] = matches
+        return found
+
+    def clusters(self, min_size=2):
+        """
+        Clusters of similar answers, largest first within each question:
+        {question, size, learners, similarity (lowest similarity that joined
+        the cluster), matches_solution}.
+        """
+        clusters = []
+        for question in self.questions:
+            number = question.number
+            members, parents = self._members[number], self._parents[number]
+
+            groups = {}
+            for group in range(len(members)):
+                groups.setdefault(self._find(parents, group), []).append(group)
+            lowest = {}
+            for a, _, similarity in self._edges[number]:
+                root = self._find(parents, a)
+                lowest[root] = min(lowest.get(root, 1.0), similarity)
+
+            found = []
+            for root, group_ids in groups.items():
+                learners = [learner for group in group_ids for learner in members[group]]
+                solution = SOLUTION in learners
+                learners = [learner for learner in learners if learner != SOLUTION]
+                if len(learners) < min_size:
+                    continue
+                found.append({
+                    'question': number,
+                    'size': len(learners),
+                    'learners': learners,
+                    'similarity': lowest.get(root, 1.0),
+                    'matches_solution': solution,
+                })
+            found.sort(key=lambda cluster: -cluster['size'])
+            clusters += found
+        return clusters
+
+    def render(self, min_size=2, limit=10):
+        """Text report of the clusters, listing up to `limit` learners of each."""
+        lines = [f"{self.plan.exam} - SIMILAR ANSWERS"]
+        clusters = self.clusters(min_size)
+        for question in self.questions:
+            found = [c for c in clusters if c['question'] == question.number]
+            lines.append(f"Q{question.number}: {len(found)} clusters")
+            for cluster in found:
+                learners = ', '.join(map(str, cluster['learners'][:limit]))
+                if cluster['size'] > limit:
+                    learners += f", ... ({cluster['size'] - limit} more)"
+                flag = ' (matches solution)' if cluster['matches_solution'] else ''
+                lines.append(f"  - {cluster['size']} learners, similarity >= "
+                             f"{cluster['similarity']:.2f}{flag}: {learners}")
+        return '\n'.join(lines)
@@ -0,0 +1,193 @@
+import json
+import sqlite3
+import time
+from autograde import instrument
+from autograde.cache import VerdictCache
+from autograde.fingerprint import fingerprint, python_fingerprint, sql_fingerprint
+from autograde.mcq import STATUSES
+from autograde.plan import question_hash
+
+"""
+Persistent verdicts, for resumable and incremental grading.
+
+Every verdict is stored in a local SQLite file with the learner answer (as
+JSON, so None or a list of choices comes back as it was submitted) and what
+it was graded against:
+
+    (exam, learner, question) -> answer, answer hash, solution hash,
+                                 grader version, status, reason
+
+The solution hash covers everything of the question that decides a verdict
+(type, solution, rule, test cases, comparison options) but not its points,
+and the grader version covers GRADER_VERSION and the marker context (dataset
+version, generated cases). A stored verdict is reused while all three hashes
+match, so:
+    - grading a cohort again after a crash only grades what was not stored yet
+    - after a fix to one answer key, `regrade_stale` regrades that question for
+      the learners graded against the old key, from their stored answers
+"""
+
+# Bump when a change to the grading code changes verdicts
+GRADER_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS verdicts (
+    exam TEXT NOT NULL,
+    learner TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    answer TEXT,
+    answer_hash TEXT NOT NULL,
+    solution_hash TEXT NOT NULL,
+    grader_version TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT,
+    elapsed REAL,
+    graded_at REAL,
+    PRIMARY KEY (exam, learner, question)
+)
+'''
+
+
+def answer_hash(question, answer):
+    if question.kind == 'sql':
+        return sql_fingerprint(str(answer))
+    if question.kind in ('function', 'expression'):
+        return python_fingerprint(str(answer))
+    return fingerprint(repr(answer))
+
+
+def load_answer(stored):
+    """Answer stored as JSON; stores written before answers were JSON hold the text."""
+    try:
+        return json.loads(stored)
+    except (TypeError, ValueError):
+        return stored
+
+
+def grader_version(marker):
+    return fingerprint(repr((GRADER_VERSION, getattr(marker, 'verdict_context', ()))))
+
+
+class VerdictStore():
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        # Several grading processes may write to the same store
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def verdicts(self, exam, learner):
+        """{question: (answer_hash, solution_hash, grader_version, status, reason)} of a learner."""
+        rows = self.conn.execute(
+            'SELECT question, answer_hash, solution_hash, grader_version, status, reason '
+            'FROM verdicts WHERE exam = ? AND learner = ?', (exam, str(learner)))
+        return {row[0]: row[1:] for row in rows}
+
+    def put_many(self, rows):
+        """Store (exam, learner, question, answer, answer_hash, solution_hash,
+        grader_version, status, reason, elapsed) rows in one transaction."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(exam, str(learner), *rest, now) for exam, learner, *rest in rows])
+
+    def stale(self, exam, question, solution_hash, version):
+        """(learner, answer, status) of the verdicts of a question graded against another key."""
+        return self.conn.execute(
+            'SELECT learner, answer, status FROM verdicts WHERE exam = ? AND question = ? '
+            'AND (solution_hash != ? OR grader_version != ?)',
+            (exam, question, solution_hash, version)).fetchall()
+
+    def summary(self, exam, learner):
+        """Marker-style summary ({status: [questions]}) of the stored verdicts of a learner."""
+        summary = {status: [] for status in STATUSES}
+        for question, (*_, status, _) in sorted(self.verdicts(exam, learner).items()):
+            summary[status].append(question)
+        return summary
+
+    def timings(self, exam):
+        """{question: mean grading time} of the verdicts stored for an exam."""
+        return dict(self.conn.execute(
+            'SELECT question, AVG(elapsed) FROM verdicts WHERE exam = ? AND elapsed IS NOT NULL '
+            'GROUP BY question', (exam,)))
+
+    def learners(self, exam):
+        return [row[0] for row in self.conn.execute(
+            'SELECT DISTINCT learner FROM verdicts WHERE exam = ?', (exam,))]
+
+    def close(self):
+        self.conn.close()
+
+
+def grade_incremental(marker, learner, submission, store):
+    """
+    Grade one submission into the marker summary, reusing the stored verdict
+    of every question whose answer, key and grader are unchanged.
+    Returns the number of questions actually graded.
+    """
+    plan = marker.plan
+    version = grader_version(marker)
+    stored = store.verdicts(plan.exam, learner)
+
+    rows = []
+    for question in plan.questions:
+        answer = submission[question.index] if question.index < len(submission) else ''
+        a_hash, s_hash = answer_hash(question, answer), question_hash(question)
+
+        verdict = stored.get(question.number)
+        if verdict is not None and verdict[:3] == (a_hash, s_hash, version):
+            status, reason = verdict[3:]
+            instrument.count('store.reused')
+            if reason:
+                marker.reasons[question.number] = reason
+        else:
+            start = time.perf_counter()
+            status = plan.grade_question(marker, question, answer)
+            marker.timings[question.number] = elapsed = time.perf_counter() - start
+            rows.append((plan.exam, learner, question.number, json.dumps(answer, default=str), a_hash, s_hash,
+                         version, status, marker.reasons.get(question.number), elapsed))
+        marker.summary[status].append(question.number)
+
+    if rows:
+        store.put_many(rows)
+    return len(rows)
+
+
+def regrade_stale(marker, store):
+    """
+    Regrade, from the stored answers, the verdicts of every question whose key
+    or grader changed since they were stored. Returns the changed verdicts as
+    (learner, question, old status, new status).
+
+    The marker is reloaded (`marker.reload()`), so a key edited after the
+    marker was created is graded against, along with the fixtures derived
+    from it, and no verdict cached in this process is reused.
+    """
+    marker.reload()
+    plan = marker.plan
+    version = grader_version(marker)
+
+    changes = []
+    enabled, VerdictCache.enabled = VerdictCache.enabled, False
+    try:
+        for question in plan.questions:
+            s_hash = question_hash(question)
+            rows = []
+            for learner, stored, old_status in store.stale(plan.exam, question.number, s_hash, version):
+                answer = load_answer(stored)
+                marker.reset()
+                start = time.perf_counter()
+                status = plan.grade_question(marker, question, answer)
+                rows.append((plan.exam, learner, question.number, stored, answer_hash(question, answer),
+                             s_hash, version, status, marker.reasons.get(question.number),
+                             time.perf_counter() - start))
+                if status != old_status:
+                    changes.append((learner, question.number, old_status, status))
+            if rows:
+                store.put_many(rows)
+    finally:
+        VerdictCache.enabled = enabled
+    return changes
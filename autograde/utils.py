@@ -2,6 +2,13 @@ import pandas as pd
 from functools import partial
 import pandas as pd
 import numpy as np
+from autograde import instrument
+from autograde.cache import SolutionCache, VerdictCache, database_identity
+from autograde.compare import ATOL, DECIMALS, ORDERS, frames_equal, match_columns, rows_equal
+from autograde.compiler import compile_expression, define_function
+from autograde.database import QueryAborted, read_query
+from autograde.fingerprint import python_fingerprint, sql_fingerprint, sql_ordered
+from autograde.harness import PASS, pass_ratio, reference_outputs, run_cases, run_function_cases
 
 
 class Utils():
@@ -9,6 +16,8 @@ class Utils():
     # Function to compare numbers or arrays if values are "equal" (or closely equal)
     is_close = partial(np.isclose, atol=1e-6, equal_nan=True)
     DEBUG = True
+    # Time budget (seconds) of a learner SQL query
+    SQL_TIMEOUT = 10.0
 
     @classmethod
     def remove_command_line(cls, block_code):
@@ -51,22 +60,37 @@ class Utils():
         Check whether two DataFrames are equal in terms of values and optionally column names.
         **kwargs:
             - same_col_name (bool): Whether to require identical column names (default: True)
+            - order (str): 'ordered' (default), 'multiset' (same rows in any order)
+              or 'set' (same distinct rows)
+            - ignore_column_order (bool): Match columns by name, or by content when
+              names are not compared, instead of by position (default: False)
+            - atol (float): Tolerance of numbers in ordered comparison (default: 1e-6)
+            - decimals (int): Rounding of numbers in unordered comparison (default: 6)
         """
-        # Check shape
-        if a_val.shape != b_val.shape:
+        order = kwargs.get('order', 'ordered')
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order '{order}', expected one of {ORDERS}")
+        decimals = kwargs.get('decimals', DECIMALS)
+
+        # Check shape (sets of rows may have different lengths)
+        if a_val.shape[1] != b_val.shape[1]:
+            return False
+        if order != 'set' and a_val.shape[0] != b_val.shape[0]:
             return False
 
         # Check column names if required
         same_col_name = kwargs.get('same_col_name', True)
-        if same_col_name and not a_val.columns.equals(b_val.columns):
+        if kwargs.get('ignore_column_order', False):
+            b_val = match_columns(a_val, b_val, same_col_name, order, decimals)
+            if b_val is None:
+                return False
+        elif same_col_name and not a_val.columns.equals(b_val.columns):
             return False
 
-        # Check each column (1D array) for equality
-        for col_a, col_b in zip(a_val.columns, b_val.columns):
-            if not cls.is_1darray_equal(a_val[col_a], b_val[col_b]):
-                return False
-
-        return True
+        if order == 'ordered':
+            # Numeric columns in one pass each, text columns in place, the rest one by one
+            return frames_equal(a_val, b_val, cls.is_1darray_equal, kwargs.get('atol', ATOL))
+        return rows_equal(a_val, b_val, order, decimals)
 
     @classmethod
     def is_equal(cls, a_val, b_val, **kwargs) -> bool:
@@ -108,8 +132,8 @@ class Utils():
             return 'INVALID'
 
         try:
-            result = eval(solution, global_dict)
-            result_sub = eval(submission, global_dict)
+            result = eval(compile_expression(solution), global_dict)
+            result_sub = eval(compile_expression(submission), global_dict)
             assert cls.is_equal(result, result_sub)
             cls.printt('You passed! Good job!')
             return True
@@ -119,30 +143,67 @@ class Utils():
             return False
 
     @classmethod
-    def check_function(cls, submission, solution, global_dict, test_cases=None):
+    def check_function(cls, submission, solution, global_dict, test_cases=None, sandbox=None,
+                       cache=False):
+        """
+        Score a learner function by the share of test cases where it returns the
+        same result as the solution. With a `sandbox`, the learner function runs
+        in an isolated worker (without access to `global_dict`).
+        With `cache`, the score of an identical answer checked earlier is reused
+        without running it or printing feedback: for cohort grading, where
+        `global_dict` does not change between learners.
+        """
         if not test_cases:
             cls.printt("No test cases input")
             return 'INVALID'
 
+        def run():
+            return cls._run_function(submission, solution, global_dict, test_cases, sandbox,
+                                     memo=cache)
+
+        if not cache:
+            return run()
+        key = ('function', python_fingerprint(str(submission)),
+               python_fingerprint(solution), repr(test_cases))
+        return VerdictCache.get_or_compute(key, run)
+
+    @classmethod
+    def _run_function(cls, submission, solution, global_dict, test_cases, sandbox=None,
+                      memo=False):
         try:
-            score = 0
-            exec(submission, global_dict)
-            exec(solution, global_dict)
-            func_name_sub = submission.split('(')[0][4:]
-            func_name_sol = solution.split('(')[0][4:]
-            for tc in test_cases:
-                result_sub = global_dict[func_name_sub](*tc)
-                result_sol = global_dict[func_name_sol](*tc)
-                if cls.is_equal(result_sub, result_sol):
-                    score += 1
+            # With `memo`, solution outputs are computed once per process
+            with instrument.phase('reference'):
+                expected = reference_outputs(solution, test_cases, global_dict, memo)
+            cases = list(zip(test_cases, expected))
+            with instrument.phase('execute'):
+                if sandbox is not None:
+                    outcome = sandbox.run(run_function_cases, submission, None, cases,
+                                          None, cls.is_equal)
+                    if not outcome['found']:
+                        raise ValueError('; '.join(outcome['messages']))
+                    results = outcome['cases']
+                else:
+                    results = run_cases(define_function(submission, global_dict), cases,
+                                        equal=cls.is_equal)
+            score = sum(r.status == PASS for r in results)
             cls.printt(f'You have passed {score}/{len(test_cases)} test cases')
-            return score/len(test_cases)
+            return pass_ratio(results)
         except Exception as e:
             cls.printt('Your solution is not correct, try again')
             return 0
 
     @classmethod
-    def check_sql(cls, answer, solution, connection=None):
+    def check_sql(cls, answer, solution, connection=None, timeout=None, cache=False, **kwargs):
+        """
+        Compare the result of a learner query with the result of the solution.
+        The learner query is aborted (and marked incorrect) when it exceeds its
+        time budget or returns more rows than the solution.
+        **kwargs are comparison options of `is_df_equal` (order, ignore_column_order,
+        atol, decimals). order='auto' compares rows in order only when the outermost
+        statement of the solution ends with an ORDER BY.
+        With `cache`, the verdict of an identical query checked earlier on the
+        same database is reused without printing feedback (cohort grading).
+        """
         if not connection:
             cls.printt("No database connection input")
             return 'INVALID'
@@ -151,11 +212,34 @@ class Utils():
             cls.printt("Your SQL answer must be a string")
             return 'INVALID'
 
+        kwargs.setdefault('same_col_name', False)
+        if kwargs.get('order') == 'auto':
+            kwargs['order'] = 'ordered' if sql_ordered(solution) else 'multiset'
+
+        def run():
+            return cls._run_sql(answer, solution, connection, timeout, **kwargs)
+
+        if not cache:
+            return run()
+        key = ('sql', sql_fingerprint(str(answer)), sql_fingerprint(solution),
+               database_identity(connection), tuple(sorted(kwargs.items())))
+        return VerdictCache.get_or_compute(key, run)
+
+    @classmethod
+    def _run_sql(cls, answer, solution, connection, timeout=None, **kwargs):
         try:
-            df_sub = pd.read_sql_query(answer, connection)
-            df_sol = pd.read_sql_query(solution, connection)
-            if cls.is_equal(df_sub, df_sol, same_col_name=False):
-                return True
+            with instrument.phase('reference'):
+                df_sol = SolutionCache.get(solution, connection)
+            # A set of rows may repeat them, so its length is not capped
+            with instrument.phase('execute'):
+                df_sub = read_query(answer, connection,
+                                    timeout=timeout or cls.SQL_TIMEOUT,
+                                    max_rows=None if kwargs.get('order') == 'set' else len(df_sol))
+            with instrument.phase('compare'):
+                correct = cls.is_equal(df_sub, df_sol, **kwargs)
+            return correct
+        except QueryAborted as e:
+            cls.printt(f'Query aborted. {e}')
             return False
         except Exception as e:
             cls.printt(f'Something went wrong. {e}')
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from autograde.utils import Utils
+
+"""
+Benchmark of Utils.is_df_equal against the former column-by-column loop.
+
+    python benchmarks/bench_compare.py --rows 50000
+
+Frames look like SQL results (ids, prices, names, dates). Each case is timed
+on equal frames (full scan) and on frames that differ in the first row (early
+exit), and both implementations must agree on every case.
+"""
+
+
+def legacy_is_df_equal(a_val, b_val):
+    if a_val.shape != b_val.shape or not a_val.columns.equals(b_val.columns):
+        return False
+    for col_a, col_b in zip(a_val.columns, b_val.columns):
+        if not Utils.is_1darray_equal(a_val[col_a], b_val[col_b]):
+            return False
+    return True
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f'Customer {i}' for i in range(1000)], dtype=object)
+    df = pd.DataFrame({
+        'OrderID': np.arange(rows),
+        'CustomerID': rng.integers(0, 1000, rows),
+        'UnitPrice': rng.random(rows) * 100,
+        'Quantity': rng.integers(1, 50, rows),
+        'Discount': rng.random(rows),
+        'CompanyName': names[rng.integers(0, 1000, rows)],
+        'City': names[rng.integers(0, 50, rows)],
+        'OrderDate': pd.Timestamp('1996-07-04') + pd.to_timedelta(rng.integers(0, 700, rows), 'D'),
+    })
+    df.loc[::97, 'City'] = None
+    return df
+
+
+def timed(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000, 200000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'case':<12} {'legacy ms':>10} {'new ms':>10} {'speedup':>8}")
+    for rows in args.rows:
+        a = make_frame(rows)
+        b = a.copy()
+        first_row = a.copy()
+        first_row.loc[0, 'UnitPrice'] += 1
+        last_text = a.copy()
+        last_text.loc[rows - 1, 'CompanyName'] = 'Someone else'
+
+        for case, other in (('equal', b), ('first row', first_row), ('last text', last_text)):
+            expected, legacy = timed(legacy_is_df_equal, a, other)
+            result, new = timed(Utils.is_df_equal, a, other)
+            assert bool(result) == bool(expected), (rows, case)
+            print(f"{rows:>8} {case:<12} {legacy * 1000:>10.2f} {new * 1000:>10.2f} {legacy / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,377 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+"""
+Grading throughput on synthetic cohorts, fully offline.
+
+    pip install -e .
+    python benchmarks/bench_grading.py --learners 200
+    python benchmarks/bench_grading.py --exam M21 --learners 1000 --workers 4 --json m21.json
+
+For each exam (M1.1 SQL on northwind.db, M2.1 functions, M3.1 pandas
+expressions on a synthetic Salaries fixture) a cohort of N learners is built
+from a seeded mix of correct, equivalent, wrong, slow, crashing and missing
+answers, graded, and reported as submissions/sec, p50/p99 latency of every
+question and peak RSS (grader, and largest child process: sandbox or pool
+workers). Everything runs against temporary cache directories.
+"""
+
+MIX = {'correct': 0.45, 'variant': 0.2, 'wrong': 0.2, 'slow': 0.05, 'crash': 0.05, 'missing': 0.05}
+
+
+def pick(rng, answers):
+    """One answer of a question, from {kind: [answers]} following MIX."""
+    kinds = [kind for kind in MIX if answers.get(kind)]
+    kind = rng.choices(kinds, weights=[MIX[kind] for kind in kinds])[0]
+    return rng.choice(answers[kind])
+
+
+def choice_answers(plan, rng):
+    answers = []
+    for question in plan.by_kind['choice']:
+        if rng.random() < MIX['correct'] + MIX['variant']:
+            answers.append((question.index, question.solution))
+        else:
+            answers.append((question.index, rng.choice('ABCDE')))
+    return answers
+
+
+def build_cohort(plan, questions, learners, seed):
+    """{learner: answers} with choice answers and one pick of `questions[number]` each."""
+    rng = random.Random(seed)
+    width = max(q.index for q in plan.questions) + 1
+    cohort = {}
+    for i in range(learners):
+        answers = [''] * width
+        for index, answer in choice_answers(plan, rng):
+            answers[index] = answer
+        for number, options in questions.items():
+            answers[plan.by_number[number].index] = pick(rng, options)
+        cohort[f'learner{i}@example.com'] = answers
+    return cohort
+
+
+# ---------------------------------------------------------------- M1.1 (SQL)
+
+SQL_SOLUTIONS = {
+    6: "SELECT * FROM Categories",
+    7: "SELECT ProductName, UnitPrice FROM Products WHERE UnitPrice > 50",
+    8: "SELECT CompanyName, City FROM Customers WHERE Country = 'Germany'",
+    9: "SELECT COUNT(*) AS n FROM Orders",
+    10: "SELECT CategoryID, COUNT(*) AS n FROM Products GROUP BY CategoryID",
+    11: "SELECT c.CompanyName, COUNT(o.OrderID) AS orders FROM Customers c "
+        "JOIN Orders o ON o.CustomerID = c.CustomerID GROUP BY c.CompanyName",
+    12: "SELECT ProductID, SUM(UnitPrice * Quantity * (1 - Discount)) AS revenue "
+        "FROM [Order Details] GROUP BY ProductID ORDER BY revenue DESC",
+    13: "SELECT e.FirstName, e.LastName, COUNT(*) AS orders FROM Employees e "
+        "JOIN Orders o ON o.EmployeeID = e.EmployeeID GROUP BY e.EmployeeID",
+    14: "SELECT ShipCountry, AVG(Freight) AS freight FROM Orders GROUP BY ShipCountry",
+    15: "SELECT p.ProductName, s.CompanyName FROM Products p "
+        "JOIN Suppliers s ON s.SupplierID = p.SupplierID WHERE p.Discontinued = 1",
+    16: "SELECT OrderID, OrderDate FROM Orders WHERE ShippedDate IS NULL",
+    17: "SELECT City FROM Customers UNION SELECT City FROM Suppliers",
+    18: "SELECT ProductName FROM Products WHERE UnitsInStock < ReorderLevel",
+    19: "SELECT o.OrderID, SUM(d.Quantity) AS items FROM Orders o "
+        "JOIN [Order Details] d ON d.OrderID = o.OrderID GROUP BY o.OrderID ORDER BY o.OrderID",
+    20: "SELECT CustomerID FROM Customers WHERE CustomerID NOT IN (SELECT CustomerID FROM Orders)",
+}
+
+SQL_SLOW = ("SELECT COUNT(*) FROM [Order Details] a, [Order Details] b, Orders c "
+            "WHERE a.Quantity + b.Quantity = c.EmployeeID")
+SQL_TOO_MANY_ROWS = "SELECT * FROM [Order Details] a, Orders b"
+
+
+def sql_variants(sql, rng, count=5):
+    """Same query written differently: case, spacing, trailing semicolon."""
+    variants = []
+    for _ in range(count):
+        words = [w.lower() if rng.random() < 0.5 and w.isupper() else w for w in sql.split(' ')]
+        variants.append(rng.choice((' ', '\n  ', '  ')).join(words) + rng.choice(('', ';')))
+    return variants
+
+
+def m11_setup(tmp):
+    from autograde.plan import load_spec
+
+    solutions = {str(q): 'ABCDE'[q % 5] for q in range(1, 6)}
+    solutions.update({str(number): sql for number, sql in SQL_SOLUTIONS.items()})
+    solutions_path = os.path.join(tmp, 'M11-solutions.json')
+    with open(solutions_path, 'w') as file:
+        json.dump(solutions, file)
+
+    spec = load_spec('M11-sql')
+    spec['solutions_file'] = solutions_path
+    spec['fixtures'] = {'database': os.path.join(ROOT, 'northwind.db')}
+    spec_path = os.path.join(tmp, 'M11-bench.json')
+    with open(spec_path, 'w') as file:
+        json.dump(spec, file)
+
+    from main import M11Marker
+
+    class BenchM11Marker(M11Marker):
+        SPEC = spec_path
+
+    return BenchM11Marker
+
+
+def m11_questions(rng):
+    questions = {}
+    for number, sql in SQL_SOLUTIONS.items():
+        questions[number] = {
+            'correct': [sql],
+            'variant': sql_variants(sql, rng),
+            'wrong': [sql.replace('SELECT', 'SELECT DISTINCT', 1) + ' LIMIT 3',
+                      sql + ' LIMIT 1'],
+            'slow': [SQL_SLOW, SQL_TOO_MANY_ROWS],
+            'crash': ['SELECT * FROM Orderz', 'SELEC 1', 'DELETE FROM Orders'],
+            'missing': [''],
+        }
+    return questions
+
+
+# ----------------------------------------------------------- M2.1 (functions)
+
+FUNCTIONS = {
+    9: {
+        'correct': ['def count_min(l):\n    return l.count(min(l))'],
+        'variant': ['def cm(l):\n    m = min(l)\n    return sum(1 for x in l if x == m)'],
+        'wrong': ['def count_min(l):\n    return l.count(l[0])'],
+        'slow': ['def count_min(l):\n    return len([x for x in l if x == min(l)])'],
+        'crash': ['def count_min(l):\n    return l.cnt(min(l))', 'def count_min(l)\n    return 0'],
+    },
+    10: {
+        'correct': ['def calculate_range(t):\n    return max(t) - min(t)'],
+        'variant': ['def r(t):\n    s = sorted(t)\n    return s[-1] - s[0]'],
+        'wrong': ['def calculate_range(t):\n    return t[-1] - t[0]'],
+        'slow': ['import time\ndef calculate_range(t):\n    time.sleep(2)\n    return max(t) - min(t)'],
+        'crash': ['def calculate_range(t):\n    return max(t) - min(t) / 0'],
+    },
+    11: {
+        'correct': ['def extract_email(e, user=True):\n    return e.split("@")[0 if user else 1]'],
+        'variant': ['import re\ndef extract_email(e, user=True):\n'
+                    '    m = re.search(r"^([\\w\\d.]+)@([\\w\\d.]+)$", e)\n'
+                    '    return m.group(1) if user else m.group(2)'],
+        'wrong': ['def extract_email(e, user=True):\n    return e'],
+        'crash': ['def extract_email(e, user=True):\n    raise ValueError(e)'],
+    },
+    12: {
+        'correct': ["def item_calculator(item, w):\n"
+                    "    return item['unit_weight' if w else 'unit_price'] * item['number_of_units']"],
+        'wrong': ["def item_calculator(item, w):\n    return item['unit_price']"],
+        'crash': ["def item_calculator(item, w):\n    return item['weight']"],
+    },
+    13: {
+        'correct': ["def heaviest_item(r):\n"
+                    "    return max(r, key=lambda k: r[k]['unit_weight'] * r[k]['number_of_units'])"],
+        'wrong': ["def heaviest_item(r):\n    return list(r)[0]"],
+        'slow': ["def heaviest_item(r):\n    x = [0] * 10 ** 9\n    return list(r)[0]"],
+    },
+    14: {
+        'correct': ["def priciest_item(r):\n"
+                    "    return max(r, key=lambda k: r[k]['unit_price'] * r[k]['number_of_units'])"],
+        'wrong': ["def priciest_item(r):\n    return min(r)"],
+        'slow': ["def priciest_item(r):\n    while True:\n        pass"],
+    },
+}
+
+
+def m21_setup(tmp):
+    from autograde import M21Marker
+    return M21Marker
+
+
+def m21_questions(rng):
+    return {number: dict(answers, missing=['']) for number, answers in FUNCTIONS.items()}
+
+
+# -------------------------------------------------------- M3.1 (expressions)
+
+JOB_TITLES = ['Transit Operator', 'Special Nurse', 'Registered Nurse', 'Custodian',
+              'Firefighter', 'Police Officer 3', 'Deputy Sheriff', 'Recreation Leader',
+              'Public Svc Aide-Public Works', 'Patient Care Assistant']
+
+
+def write_salaries(path, rows, seed):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(70000, 25000, rows).round(2)
+    overtime = rng.exponential(5000, rows).round(2)
+    other = rng.exponential(2000, rows).round(2)
+    df = pd.DataFrame({
+        'Id': np.arange(1, rows + 1),
+        'EmployeeName': [f'EMPLOYEE {i}' for i in range(rows)],
+        'JobTitle': rng.choice([t.upper() for t in JOB_TITLES], rows, p=np.linspace(2, 1, 10) / 15),
+        'BasePay': base,
+        'OvertimePay': overtime,
+        'OtherPay': other,
+        'Benefits': rng.normal(25000, 5000, rows).round(2),
+        'TotalPay': base + overtime + other,
+        'TotalPayBenefits': base + overtime + other,
+        'Year': rng.integers(2011, 2015, rows),
+        'Notes': np.nan,
+        'Agency': 'San Francisco',
+        'Status': np.nan,
+    })
+    df.to_csv(path, index=False)
+
+
+EXPRESSIONS = {
+    10: {
+        'variant': ["df.loc[df.TotalPay > df.TotalPay.mean()]",
+                    "df[df['TotalPay'].gt(df['TotalPay'].mean())]"],
+        'wrong': ["df[df['TotalPay'] > df['TotalPay'].median()]", "df[df['TotalPay'] >= 0]"],
+        'slow': ["df[df.apply(lambda r: r['TotalPay'] > df['TotalPay'].mean(), axis=1)]"],
+        'crash': ["df[df['Salary'] > 0]", "df[df['TotalPay'] >]"],
+    },
+    14: {
+        'variant': ["df.JobTitle.value_counts().head(5)", "df['JobTitle'].value_counts()[:5]"],
+        'wrong': ["df['JobTitle'].value_counts().tail()", "df['JobTitle'].unique()[:5]"],
+        'crash': ["df['Job'].value_counts()"],
+    },
+    15: {
+        'variant': ["df[df.JobTitle.isin(df.JobTitle.value_counts().index[:5])]"
+                    "[['Year', 'JobTitle', 'BasePay', 'OvertimePay', 'TotalPay']]"],
+        'wrong': ["df.head()"],
+        'crash': ["df[['Year', 'Job']]"],
+    },
+    16: {
+        'wrong': ["pd.pivot_table(data=df, index=['JobTitle'], values=['TotalPay'])"],
+        'crash': ["pd.pivot_table(data=df, index=['Title'])"],
+    },
+}
+
+
+def m31_setup(tmp, rows=20000, seed=0):
+    path = os.path.join(tmp, 'Salaries.csv')
+    write_salaries(path, rows, seed)
+    os.environ['AUTOGRADE_DATASET_SALARIES'] = path
+
+    from autograde import M31Marker
+    return M31Marker
+
+
+def m31_questions(rng, plan):
+    questions = {}
+    for number, answers in EXPRESSIONS.items():
+        questions[number] = dict(answers, correct=[plan.by_number[number].options['reference']],
+                                 missing=[''])
+    return questions
+
+
+# -------------------------------------------------------------------- driver
+
+def peak_rss_mb():
+    """Peak RSS of this process and of its largest child, in MB (Linux: ru_maxrss is in kB)."""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+
+def grade(marker_cls, cohort, workers):
+    from autograde.batch import grade_cohort, mark
+
+    if workers:
+        report = grade_cohort(marker_cls, cohort, max_workers=workers)
+        return report['results'], report['elapsed']
+
+    marker = marker_cls()
+    results = []
+    start = time.perf_counter()
+    # Markers print why answers fail, which is not what is measured here
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for learner, answers in cohort.items():
+            marker.reset()
+            mark(marker, answers)
+            results.append({'learner': learner, 'summary': marker.summary,
+                            'timings': dict(marker.timings), 'error': None})
+    return results, time.perf_counter() - start
+
+
+def report(exam, results, elapsed):
+    latencies = {}
+    for result in results:
+        for number, seconds in (result.get('timings') or {}).items():
+            latencies.setdefault(number, []).append(seconds * 1000)
+
+    questions = {
+        number: {'p50_ms': float(np.percentile(values, 50)),
+                 'p99_ms': float(np.percentile(values, 99))}
+        for number, values in sorted(latencies.items())
+    }
+    rss, children_rss = peak_rss_mb()
+    return {
+        'exam': exam,
+        'learners': len(results),
+        'errors': sum(r['error'] is not None for r in results),
+        'elapsed_s': elapsed,
+        'submissions_per_s': len(results) / elapsed if elapsed else 0.0,
+        'questions': questions,
+        'peak_rss_mb': rss,
+        'peak_child_rss_mb': children_rss,
+    }
+
+
+def print_report(result):
+    print(f"\n{result['exam']}: {result['learners']} learners in {result['elapsed_s']:.2f}s "
+          f"({result['submissions_per_s']:.1f} submissions/s, {result['errors']} errors)")
+    print(f"peak RSS {result['peak_rss_mb']:.0f} MB, largest child {result['peak_child_rss_mb']:.0f} MB")
+    print(f"{'question':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for number, latency in result['questions'].items():
+        print(f"{'Q' + str(number):>8} {latency['p50_ms']:>10.3f} {latency['p99_ms']:>10.3f}")
+
+
+EXAMS = {
+    'M11': (m11_setup, lambda rng, plan: m11_questions(rng)),
+    'M21': (m21_setup, lambda rng, plan: m21_questions(rng)),
+    'M31': (m31_setup, m31_questions),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exam', choices=[*EXAMS, 'all'], default='all')
+    parser.add_argument('--learners', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='process pool size, 0 grades in this process')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sql-timeout', type=float, default=1.0)
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='autograde-bench-')
+    os.environ['AUTOGRADE_CACHE_DIR'] = os.path.join(tmp, 'cache')
+
+    from autograde.utils import Utils
+    Utils.DEBUG = False
+    Utils.SQL_TIMEOUT = args.sql_timeout
+
+    results = []
+    for exam in (EXAMS if args.exam == 'all' else [args.exam]):
+        setup, questions = EXAMS[exam]
+        marker_cls = setup(tmp)
+        plan = marker_cls().plan
+        rng = random.Random(args.seed)
+        cohort = build_cohort(plan, questions(rng, plan), args.learners, args.seed)
+
+        graded, elapsed = grade(marker_cls, cohort, args.workers)
+        results.append(report(plan.exam, graded, elapsed))
+        print_report(results[-1])
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
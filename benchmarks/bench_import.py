@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+"""
+Cold start budget of multiple choice grading.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget 100 --runs 10
+
+Each run starts a fresh interpreter that imports autograde, gets the M1.2
+marker from the registry, grades one multiple choice submission, scores it
+and renders its summary (printed to a buffer), as a notebook does. The
+median time of the runs must stay within the budget (milliseconds), and
+neither pandas nor NumPy may have been imported. Exits with status 1 when
+either check fails, so it can gate a CI job.
+"""
+
+BUDGET_MS = 100
+
+SUBMISSION = ['B', 'B', 'D', 'C', 'D', 'B', 'C', 'B', 'C', 'B', 'A', 'A', '3', '200', 'B']
+
+SCRIPT = f'''
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+from autograde import get_marker
+marker = get_marker('M1.2')
+marker.check_multiple({SUBMISSION!r})
+marker.score()
+with contextlib.redirect_stdout(io.StringIO()):
+    marker.display_summary(marker.summary)
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'ms': elapsed * 1000,
+    'heavy': sorted(m for m in ('pandas', 'numpy', 'pyarrow') if m in sys.modules),
+}}))
+'''
+
+
+def cold_start():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        p for p in (ROOT, os.environ.get('PYTHONPATH')) if p))
+    output = subprocess.run([sys.executable, '-c', SCRIPT], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=float, default=BUDGET_MS, help='milliseconds')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    # The first run also writes the bytecode caches
+    cold_start()
+    runs = [cold_start() for _ in range(args.runs)]
+    median = statistics.median(run['ms'] for run in runs)
+    heavy = sorted({m for run in runs for m in run['heavy']})
+
+    print(f"MCQ cold start: {median:.1f} ms median of {args.runs} runs "
+          f"(budget {args.budget:g} ms)")
+    failed = False
+    if median > args.budget:
+        print(f"FAIL: over budget by {median - args.budget:.1f} ms")
+        failed = True
+    if heavy:
+        print(f"FAIL: imported {', '.join(heavy)}")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
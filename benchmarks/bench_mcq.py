@@ -0,0 +1,81 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from autograde.mcq import MCQScorer
+from autograde.registry import get_marker
+
+"""
+Multiple choice scoring of a whole cohort.
+
+    python benchmarks/bench_mcq.py --learners 10000 100000
+
+Builds a synthetic cohort of multiple choice answers (the correct answer,
+another option, a variant with spaces or in lower case, or nothing) and
+scores it learner by learner through the grading plan, as the markers do,
+and at once with MCQScorer: the status matrix alone (what cohort scoring
+needs) and with the marker-style summaries. Checks that both give the same
+summaries.
+"""
+
+OPTIONS = ['A', 'B', 'C', 'D', 'E', 'A,C', 'C,D', 'c,e', ' B', 'B, D', '3', '200']
+
+
+def cohort(rng, plan, n):
+    questions = plan.by_kind['choice']
+    size = max(q.index for q in questions) + 1
+    submissions = []
+    for _ in range(n):
+        submission = [''] * size
+        for q in questions:
+            r = rng.random()
+            if r < 0.6:
+                submission[q.index] = q.solution
+            elif r < 0.95:
+                submission[q.index] = rng.choice(OPTIONS)
+        submissions.append(submission)
+    return submissions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exam', default='M21')
+    parser.add_argument('--learners', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    marker = get_marker(args.exam)
+    plan = marker.plan
+    scorer = MCQScorer(marker.multiple_choice())
+    # NumPy is imported by the first cohort scored, not timed
+    scorer.score([])
+
+    print(f"{'learners':>9} {'per learner s':>14} {'matrix s':>9} {'+ summaries s':>14} {'speedup':>8}")
+    for n in args.learners:
+        submissions = cohort(random.Random(args.seed), plan, n)
+
+        start = time.perf_counter()
+        expected = []
+        for submission in submissions:
+            marker.reset()
+            expected.append(plan.grade(marker, submission, kinds=('choice',)))
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        statuses = scorer.score(submissions)
+        matrix = time.perf_counter() - start
+        summaries = scorer.summaries(statuses)
+        batched = time.perf_counter() - start
+        assert summaries == expected, "MCQScorer summaries differ from the grading plan"
+
+        print(f"{n:>9} {sequential:>14.3f} {matrix:>9.3f} {batched:>14.3f} "
+              f"{sequential / matrix:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import contextlib
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bench_grading
+from autograde.plan import load_plan
+
+"""
+Single-learner latency with and without the question scheduler.
+
+    python benchmarks/bench_scheduler.py --concurrency 4
+
+Grades the same synthetic M1.1 (SQL) and M3.1 (expression) submissions one
+learner at a time, as the "grade this email" notebook flow does, with a
+sequential marker and with a marker grading questions on `--concurrency`
+threads, checks that both produce the same summaries and reports the median
+latency per learner. Verdict caching is off so every answer is executed.
+"""
+
+
+def latencies(marker, cohort):
+    from autograde.batch import mark
+
+    times, summaries = [], []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for answers in cohort.values():
+            marker.reset()
+            start = time.perf_counter()
+            mark(marker, answers)
+            times.append(time.perf_counter() - start)
+            summaries.append(marker.summary)
+    return times, summaries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--learners', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from autograde.cache import VerdictCache
+    VerdictCache.enabled = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['AUTOGRADE_CACHE_DIR'] = tmp
+        for exam in ('M11', 'M31'):
+            setup, questions = bench_grading.EXAMS[exam]
+            marker_cls = setup(tmp)
+            plan = load_plan(marker_cls.SPEC)
+            rng = random.Random(args.seed)
+            cohort = bench_grading.build_cohort(plan, questions(rng, plan), args.learners, args.seed)
+
+            sequential, expected = latencies(marker_cls(), cohort)
+            concurrent, summaries = latencies(marker_cls(concurrency=args.concurrency), cohort)
+            assert summaries == expected, f"{exam}: summaries differ with the scheduler"
+
+            before, after = statistics.median(sequential), statistics.median(concurrent)
+            print(f"{exam}: median {before * 1000:.1f} ms sequential, {after * 1000:.1f} ms "
+                  f"on {args.concurrency} threads ({before / after:.2f}x), same summaries")
+
+
+if __name__ == '__main__':
+    main()
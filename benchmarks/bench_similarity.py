@@ -0,0 +1,133 @@
+import argparse
+import itertools
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from autograde.plan import load_plan
+from autograde.similarity import CohortSimilarity, python_tokens, shingles
+
+"""
+Near-duplicate detection on synthetic M2.1 cohorts.
+
+    python benchmarks/bench_similarity.py --learners 1000 4000 16000
+
+Every learner writes their own functions (an approach picked at random, with
+extra statements of their own); a share of learners copy the answers of
+another learner, renaming variables, reformatting and adding comments. For
+each cohort size the report shows the time to index the cohort, the planted
+copies found (recall) and the learners clustered without having copied.
+The pairwise Jaccard baseline is timed on the smallest cohort only.
+"""
+
+APPROACHES = [
+    'def {f}({a}):\n    {m} = min({a})\n    {c} = 0\n    for {x} in {a}:\n        if {x} == {m}:\n            {c} += 1\n{extra}    return {c}',
+    'def {f}({a}):\n{extra}    return {a}.count(min({a}))',
+    'def {f}({a}):\n    {s} = sorted({a})\n{extra}    return {s}.count({s}[0])',
+    'def {f}({a}):\n    {c} = len([{x} for {x} in {a} if {x} == min({a})])\n{extra}    return {c}',
+]
+
+NAMES = ['l', 'lst', 'nums', 'data', 'values', 'arr', 'x', 'y', 'i', 'j', 'k', 'n', 'm',
+         'count', 'cnt', 'res', 'result', 'total', 'smallest', 'low', 'tmp', 's', 'item']
+
+
+def extra_statements(rng, names):
+    lines = []
+    for _ in range(rng.randint(2, 6)):
+        target, left, right = rng.choice(names), rng.choice(names), rng.randint(0, 99)
+        op = rng.choice(['+', '-', '*', '//', '%'])
+        lines.append(f'    {target}_{rng.randint(0, 9)} = {left} {op} {right}\n')
+    return ''.join(lines)
+
+
+def honest_answer(rng):
+    names = rng.sample(NAMES, 5)
+    return rng.choice(APPROACHES).format(
+        f='count_min', a=names[0], m=names[1], c=names[2], x=names[3], s=names[4],
+        extra=extra_statements(rng, names))
+
+
+def disguise(rng, answer):
+    """A copy: names swapped for others, blank lines and a comment added."""
+    for name in NAMES:
+        answer = re.sub(rf'(?<!\.)\b{name}\b', f'{name}_{rng.randint(10, 99)}', answer)
+    lines = []
+    for line in answer.split('\n'):
+        lines.append(line)
+        if rng.random() < 0.3:
+            lines.append('')
+    return '# my solution\n' + '\n'.join(lines)
+
+
+def cohort(rng, n, copy_share):
+    answers, copies = {}, []
+    for i in range(n):
+        learner = f'learner{i}'
+        if answers and rng.random() < copy_share:
+            source = rng.choice(list(answers))
+            answers[learner] = disguise(rng, answers[source])
+            copies.append((source, learner))
+        else:
+            answers[learner] = honest_answer(rng)
+    return answers, copies
+
+
+def pairwise(answers, threshold):
+    sets = {learner: shingles(python_tokens(answer)) for learner, answer in answers.items()}
+    found = 0
+    for (_, a), (_, b) in itertools.combinations(sets.items(), 2):
+        if len(a & b) / len(a | b) >= threshold:
+            found += 1
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--learners', type=int, nargs='+', default=[1000, 4000, 16000])
+    parser.add_argument('--copies', type=float, default=0.05, help='share of learners copying')
+    parser.add_argument('--threshold', type=float, default=0.8)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    plan = load_plan('M21')
+    index = plan.by_number[9].index
+
+    print(f"{'learners':>9} {'index s':>9} {'per learner ms':>15} {'recall':>8} {'other clustered':>16}")
+    for n in args.learners:
+        rng = random.Random(args.seed)
+        answers, copies = cohort(rng, n, args.copies)
+
+        similarity = CohortSimilarity(plan, threshold=args.threshold)
+        start = time.perf_counter()
+        for learner, answer in answers.items():
+            submission = [''] * (index + 1)
+            submission[index] = answer
+            similarity.add(learner, submission)
+        elapsed = time.perf_counter() - start
+
+        cluster_of = {}
+        for i, cluster in enumerate(similarity.clusters()):
+            for learner in cluster['learners']:
+                cluster_of[learner] = i
+        found = sum(1 for a, b in copies if a in cluster_of and cluster_of.get(a) == cluster_of.get(b))
+        involved = {learner for pair in copies for learner in pair}
+        others = sum(1 for learner in cluster_of if learner not in involved)
+        recall = found / len(copies) if copies else 1.0
+        print(f"{n:>9} {elapsed:>9.2f} {elapsed / n * 1000:>15.3f} {recall:>8.1%} {others:>16}")
+
+    n = min(args.learners)
+    answers, _ = cohort(random.Random(args.seed), n, args.copies)
+    start = time.perf_counter()
+    pairwise(answers, args.threshold)
+    elapsed = time.perf_counter() - start
+    print(f"pairwise Jaccard baseline: {n} learners in {elapsed:.2f}s "
+          f"(~{elapsed * (max(args.learners) / n) ** 2:.0f}s for {max(args.learners)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
-import json
-import sqlite3
-from autograde.utils import Utils
+from autograde import instrument
+from autograde.database import ConnectionProvider
+from autograde.plan import load_plan
+from autograde.scheduler import QuestionScheduler
 
 
 class ExamMarkerBase(ABC):
     def __init__(self):
         self.solutions = self.get_solutions()
         self.summary = self.initialize_summary()
+        self.reasons = {}
+        self.timings = {}
 
     def initialize_summary(self):
         return {
@@ -17,6 +20,11 @@ class ExamMarkerBase(ABC):
             'Correct': [],
         }
 
+    def reset(self):
+        self.summary = self.initialize_summary()
+        self.reasons = {}
+        self.timings = {}
+
     @abstractmethod
     def get_solutions(self):
         pass
@@ -39,70 +47,77 @@ class ExamMarkerBase(ABC):
 
 
 class M11Marker(ExamMarkerBase):
-    QUESTION_SCORES = {
-        range(1, 6): 2,
-        range(6, 10): 3,
-        range(10, 16): 8,
-        range(16, 21): 6,
-    }
-
-    def __init__(self):
+    # Name (or path) of the exam spec
+    SPEC = 'M11-sql'
+
+    def __init__(self, concurrency=1):
+        """
+        With `concurrency` above 1, the SQL questions of a submission are
+        graded side by side on as many threads, each with its own connection.
+        """
+        # Questions 1-5 are multiple choice, 6-20 are SQL on northwind.db
+        self.plan = load_plan(self.SPEC)
         super().__init__()
-        self.exam_name = "M1.1"
-        self.conn = sqlite3.connect("northwind.db")
+        self.exam_name = self.plan.exam
+        with instrument.phase('fixture'):
+            self.database = ConnectionProvider.get(self.plan.fixtures['database'])
+        # Verdicts depend on the content of the database (size, modification time)
+        self.verdict_context = self.database.identity[2:]
+        self.scheduler = QuestionScheduler(concurrency) if concurrency > 1 else None
+
+    @property
+    def conn(self):
+        # Connection of the calling thread
+        return self.database.connection()
 
     def get_solutions(self):
-        with open('solutions/M11.json', 'r') as file:
-            return json.load(file)
+        return self.plan.solutions()
 
-    def check_submission(self, submission, is_sql=False, start_index=1):
-        for i, answer in enumerate(submission, start_index):
-            solution = self.solutions.get(str(i))
-            correct = None
-
-            if answer:
-                if is_sql:
-                    correct = Utils.check_sql(answer, solution, self.conn)
-                else:
-                    correct = answer == solution
-
-            self.update_summary(i, correct)
+    def reload(self):
+        """Compile the spec again (e.g. after an answer key was edited)."""
+        self.plan = load_plan(self.SPEC, reload=True)
+        self.exam_name = self.plan.exam
+        self.solutions = self.get_solutions()
+        with instrument.phase('fixture'):
+            self.database = ConnectionProvider.get(self.plan.fixtures['database'])
+        self.verdict_context = self.database.identity[2:]
 
     def mark_submission(self, submission):
-        self.check_submission(submission[:5], is_sql=False, start_index=1)
-        self.check_submission(submission[5:], is_sql=True, start_index=6)
-        return self.summary
+        if self.scheduler is not None:
+            return self.scheduler.grade(self, submission)
+        return self.plan.grade(self, submission)
 
     def calculate_score(self, question_number):
-        for question_range, score in self.QUESTION_SCORES.items():
-            if question_number in question_range:
-                return score
-        return 0
+        return self.plan.scores.question_points(question_number, 'Correct')
+
+    def score(self, summary=None):
+        return self.plan.scores.score(self.summary if summary is None else summary)
 
     def calculate_final_score(self):
-        return sum(self.calculate_score(q) for q in self.summary['Correct'])
+        return self.plan.scores.score(self.summary).total
 
     def display_summary(self, summary):
         print(f"{self.exam_name} - EXAM SUMMARY")
 
+        score = self.plan.scores.score(summary)
         for key, value in summary.items():
             print(f"{key}: {len(value)}")
             for question in value:
-                score = f"{self.calculate_score(question)}/{self.calculate_score(question)}" if key == 'Correct' else "0"
-                print(f"  - Q{question} ({score})")
+                max_points = score.questions[question].max_points
+                points = f"{max_points:g}/{max_points:g}" if key == 'Correct' else "0"
+                print(f"  - Q{question} ({points})")
 
-        final_score = self.calculate_final_score()
-        print(f"FINAL SCORE: {final_score}/100")
+        print(f"FINAL SCORE: {score.total:g}/{score.max_total}")
 
 
 if __name__ == '__main__':
     import requests
+    from autograde.ingest import normalize
     email = "hodominhquan.self@gmail.com"
     response = requests.get(
         f"https://cspyclient.up.railway.app/submission/{email}")
-    submission = response.json()['answers']
-    s = [question['answer'] for question in submission]
+    _, s = normalize(response.json())
 
-    marker = M11Marker()
+    marker = M11Marker(concurrency=4)
     marker.mark_submission(s)
     marker.display_summary(marker.summary)
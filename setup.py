@@ -4,7 +4,11 @@ setup(
     name='autograde',
     version='0.0.11',
     packages=find_packages(),
+    package_data={'autograde': ['specs/*.json']},
     install_requires=[
 
     ],
+    extras_require={
+        'fetch': ['aiohttp'],
+    },
 )
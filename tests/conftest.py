@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+"""Shared fixtures: a small synthetic Salaries dataset for the M3.1 marker."""
+
+JOB_TITLES = ['TRANSIT OPERATOR', 'SPECIAL NURSE', 'REGISTERED NURSE', 'CUSTODIAN',
+              'FIREFIGHTER', 'POLICE OFFICER 3', 'DEPUTY SHERIFF']
+
+
+@pytest.fixture
+def salaries(tmp_path, monkeypatch):
+    """Offline Salaries dataset and an empty cache directory for one test."""
+    pd = pytest.importorskip('pandas')
+    from autograde.cache import VerdictCache
+    from autograde.datasets import DatasetRegistry
+    from autograde.references import ReferenceStore
+
+    rng = np.random.default_rng(0)
+    rows = 2000
+    base = rng.normal(70000, 25000, rows).round(2)
+    overtime = rng.exponential(5000, rows).round(2)
+    path = tmp_path / 'Salaries.csv'
+    pd.DataFrame({
+        'Id': np.arange(1, rows + 1),
+        'EmployeeName': [f'EMPLOYEE {i}' for i in range(rows)],
+        'JobTitle': rng.choice(JOB_TITLES, rows),
+        'BasePay': base,
+        'OvertimePay': overtime,
+        'OtherPay': 0.0,
+        'Benefits': rng.normal(25000, 5000, rows).round(2),
+        'TotalPay': base + overtime,
+        'TotalPayBenefits': base + overtime,
+        'Year': rng.integers(2011, 2015, rows),
+        'Notes': np.nan,
+        'Agency': 'San Francisco',
+        'Status': np.nan,
+    }).to_csv(path, index=False)
+
+    monkeypatch.setenv('AUTOGRADE_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('AUTOGRADE_DATASET_SALARIES', str(path))
+    for cache in (DatasetRegistry, ReferenceStore, VerdictCache):
+        cache.clear()
+    yield path
+    for cache in (DatasetRegistry, ReferenceStore, VerdictCache):
+        cache.clear()
@@ -0,0 +1,38 @@
+import pytest
+
+from autograde.main import M31Marker
+
+"""
+M3.1 expressions run in sandbox workers reused across learners: an in-place
+expression must not change the frame the next learners are graded on.
+"""
+
+IN_PLACE = 'df.drop(df.index[:1000], inplace=True)'
+CORRECT = 'df[df.TotalPay > df.TotalPay.mean()]'
+
+
+def submission(marker, number, answer):
+    answers = [''] * (marker.plan.by_number[number].index + 1)
+    answers[marker.plan.by_number[number].index] = answer
+    return answers
+
+
+def grade(marker, number, answer):
+    marker.reset()
+    return marker.mark_exam(submission(marker, number, answer))
+
+
+@pytest.mark.parametrize('isolated', [True, False])
+def test_in_place_expression_does_not_leak(salaries, isolated):
+    marker = M31Marker()
+    if not isolated:
+        # Where fork is not available, expressions run against the grader's frame
+        marker.sandbox.isolated = False
+    rows = len(marker.df)
+
+    grade(marker, 10, IN_PLACE)
+    summary = grade(marker, 10, CORRECT)
+
+    assert 10 in summary['Correct']
+    assert len(marker.df) == rows
+    marker.sandbox.close()
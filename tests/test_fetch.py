@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from autograde.fakeserver import FakeSubmissionServer
+from autograde.fetch import SubmissionFetcher
+
+"""
+SubmissionFetcher against the local FakeSubmissionServer: retries, 304s from
+the ETag cache and records that cannot be read.
+"""
+
+SUBMISSIONS = {
+    'a@example.com': ['A', 'C'],
+    'b@example.com': ['B', 'D'],
+}
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('AUTOGRADE_CACHE_DIR', str(tmp_path))
+
+
+def test_retries_failed_requests():
+    with FakeSubmissionServer(SUBMISSIONS, failures=2) as server:
+        fetcher = SubmissionFetcher(server.url, retries=3, backoff=0.01)
+        submissions = fetcher.fetch(list(SUBMISSIONS))
+
+    assert submissions == SUBMISSIONS
+    assert fetcher.stats['retries'] == 4
+    assert fetcher.errors == {}
+
+
+def test_gives_up_after_retries():
+    with FakeSubmissionServer(SUBMISSIONS, failures=5) as server:
+        fetcher = SubmissionFetcher(server.url, retries=1, backoff=0.01)
+        submissions = fetcher.fetch(['a@example.com'])
+
+    assert submissions == {}
+    assert 'HTTP 503 after 2 attempts' in fetcher.errors['a@example.com']
+
+
+def test_unchanged_submissions_are_not_modified():
+    with FakeSubmissionServer(SUBMISSIONS) as server:
+        first = SubmissionFetcher(server.url).fetch(list(SUBMISSIONS))
+        fetcher = SubmissionFetcher(server.url)
+        second = fetcher.fetch(list(SUBMISSIONS))
+
+    assert first == second == SUBMISSIONS
+    assert fetcher.stats['not_modified'] == len(SUBMISSIONS)
+
+
+def test_malformed_body_is_recorded_per_learner():
+    emails = list(SUBMISSIONS) + ['missing@example.com']
+    with FakeSubmissionServer(SUBMISSIONS, malformed=['a@example.com']) as server:
+        fetcher = SubmissionFetcher(server.url, backoff=0.01)
+        submissions = fetcher.fetch(emails)
+
+    assert submissions == {'b@example.com': ['B', 'D']}
+    assert list(fetcher.errors) == ['a@example.com']
+    assert 'malformed response' in fetcher.errors['a@example.com']
+
+
+def test_email_is_quoted_in_the_path():
+    submissions = {'first#last?x/y@example.com': ['A']}
+    with FakeSubmissionServer(submissions) as server:
+        fetcher = SubmissionFetcher(server.url)
+        assert fetcher.fetch(list(submissions)) == submissions
+    assert fetcher.errors == {}
@@ -0,0 +1,23 @@
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'benchmarks'))
+
+from bench_import import BUDGET_MS, cold_start
+
+"""
+Cold start of multiple choice grading, in fresh interpreters: import
+autograde, grade, score and render one M1.2 submission within the budget,
+without importing pandas or NumPy.
+"""
+
+
+def test_mcq_cold_start():
+    # The first run also writes the bytecode caches
+    cold_start()
+    runs = [cold_start() for _ in range(3)]
+
+    assert not {module for run in runs for module in run['heavy']}
+    assert statistics.median(run['ms'] for run in runs) <= BUDGET_MS
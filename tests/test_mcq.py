@@ -0,0 +1,82 @@
+import pytest
+
+from autograde.mcq import STATUSES, MCQScorer, grade_choice
+from autograde.plan import load_plan
+
+"""
+Multiple choice rules, pinned to the verdicts the exam markers have always
+given (answers are compared as submitted, never stripped).
+"""
+
+
+def status(answer, solution, rule='exact'):
+    return STATUSES[grade_choice(answer, solution, rule)]
+
+
+@pytest.mark.parametrize('answer, expected', [
+    ('B', 'Correct'),
+    ('', 'Not submitted'),
+    (None, 'Not submitted'),
+    (' B', 'Incorrect'),
+    ('b', 'Incorrect'),
+    ('C', 'Incorrect'),
+])
+def test_exact(answer, expected):
+    assert status(answer, 'B') == expected
+
+
+@pytest.mark.parametrize('answer, expected', [
+    (['B', 'D'], 'Correct'),
+    (['D', 'B'], 'Incorrect'),
+    ('B,D', 'Incorrect'),
+    ('B', 'Incorrect'),
+])
+def test_exact_list_solution(answer, expected):
+    assert status(answer, ['B', 'D']) == expected
+
+
+@pytest.mark.parametrize('answer, expected', [
+    ('A', 'Correct'),
+    ('B', 'Correct'),
+    (['A', 'B'], 'Correct'),
+    ('A,B', 'Incorrect'),
+    (['B', 'A'], 'Incorrect'),
+    ('a', 'Incorrect'),
+    ('C', 'Incorrect'),
+])
+def test_any(answer, expected):
+    assert status(answer, ['A', 'B'], 'any') == expected
+
+
+@pytest.mark.parametrize('answer, expected', [
+    ('A,C', 'Correct'),
+    ('c,a', 'Correct'),
+    ('A,C,A', 'Correct'),
+    ('A, C', 'Partial'),
+    ('A,C,', 'Partial'),
+    ('A,B', 'Partial'),
+    ('A', 'Partial'),
+    ('B,D', 'Incorrect'),
+    (' A, C', 'Incorrect'),
+    ('', 'Not submitted'),
+])
+def test_partial(answer, expected):
+    assert status(answer, 'A,C', 'partial') == expected
+
+
+@pytest.mark.parametrize('exam', ['M11', 'M12', 'M21', 'M31'])
+def test_cohort_scorer_matches_grade_choice(exam):
+    plan = load_plan(exam)
+    questions = [(q.number, q.index, q.solution, q.rule) for q in plan.by_kind['choice']]
+    answers = ['A', 'B', 'B,D', ['B', 'D'], ' B', 'a,c', 'A, C', 'C,E', '3', '', None]
+    submissions = []
+    for i in range(50):
+        submission = [''] * (max(index for _, index, _, _ in questions) + 1)
+        for column, (_, index, _, _) in enumerate(questions):
+            submission[index] = answers[(i + column) % len(answers)]
+        submissions.append(submission)
+
+    statuses = MCQScorer(questions).score(submissions)
+    for submission, row in zip(submissions, statuses):
+        assert list(row) == [grade_choice(submission[index], solution, rule)
+                             for _, index, solution, rule in questions]
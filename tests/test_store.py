@@ -0,0 +1,41 @@
+import json
+
+from autograde.main import M31Marker
+from autograde.plan import SPEC_DIR
+from autograde.store import VerdictStore, grade_incremental, regrade_stale
+
+"""
+Incremental grading and regrading after an answer key is edited, with a
+marker that has already graded (and cached its references).
+"""
+
+ANSWER = "df[df['TotalPay'] > df['TotalPay'].median()]"
+
+
+def test_regrade_after_edited_reference(salaries, tmp_path):
+    with open(f'{SPEC_DIR}/M31.json') as file:
+        spec = json.load(file)
+    path = tmp_path / 'M31.json'
+    path.write_text(json.dumps(spec))
+
+    class Marker(M31Marker):
+        SPEC = str(path)
+
+    marker = Marker()
+    store = VerdictStore(str(tmp_path / 'verdicts.db'))
+    submission = [''] * (marker.plan.by_number[10].index + 1)
+    submission[marker.plan.by_number[10].index] = ANSWER
+    grade_incremental(marker, 'l1', submission, store)
+    assert 10 in store.summary(marker.exam_name, 'l1')['Incorrect']
+
+    for question in spec['questions']:
+        if question['number'] == 10:
+            question['reference'] = ANSWER
+    path.write_text(json.dumps(spec))
+
+    assert regrade_stale(marker, store) == [('l1', 10, 'Incorrect', 'Correct')]
+    assert 10 in store.summary(marker.exam_name, 'l1')['Correct']
+    # Stored under the new key, nothing is stale any more
+    assert regrade_stale(marker, store) == []
+    marker.sandbox.close()
+    store.close()